@@ -0,0 +1,369 @@
+"""
+Load test of the whole API over HTTP, against local stand-ins for Netlify
+and GitHub with injected latency. A fixed number of virtual users each sign
+in through the OAuth callback, then run a weighted mix of list, create,
+update, delete and login requests until the time is up.
+
+    python benchmarks/bench_load.py [--users 20] [--duration 30]
+        [--netlify-latency 0.05] [--github-latency 0.1]
+        [--mix list=50,create=15,update=15,delete=10,login=10]
+
+Runs on a throwaway SQLite database unless POSTGRES_DB_URL is set (apply the
+migrations to it first). Rate limits are lifted so the app, not the limiter,
+is measured. Each run is stored as JSON in benchmarks/results/, named after
+the commit, and compared with the previous stored run.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+# Add the src and test directories to Python path
+current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(current_dir, "src"))
+sys.path.append(os.path.join(current_dir, "test"))
+
+_db_dir = tempfile.mkdtemp()
+for name, value in {
+    "NETLIFY_ACCESS_KEY": "bench",
+    "POSTGRES_DB_URL": f"sqlite:///{_db_dir}/bench_load.db",
+    "SECRET_KEY": "bench-secret",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+    "GITHUB_CLIENT_ID": "bench",
+    "GITHUB_CLIENT_SECRET": "bench",
+    "NETLIFY_DOMAIN_ZONE_ID": "zone-1",
+    "NETLIFY_DOMAIN": "fosscu.org",
+    "BASE_DOMAIN": "fosscu.org",
+}.items():
+    os.environ.setdefault(name, value)
+
+from fake_github import FakeGitHub
+from fake_netlify import FakeNetlify, serve
+
+RESULTS_DIR = os.path.join(current_dir, "benchmarks", "results")
+OPERATIONS = ("list", "create", "update", "delete", "login")
+DEFAULT_MIX = "list=50,create=15,update=15,delete=10,login=10"
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    weights = {}
+    for part in mix.split(","):
+        operation, _, weight = part.partition("=")
+        if operation not in OPERATIONS or not weight.isdigit():
+            raise argparse.ArgumentTypeError(f"Bad mix entry: {part!r}")
+        weights[operation] = int(weight)
+    return weights
+
+
+class VirtualUser:
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        github: FakeGitHub,
+        run_tag: str,
+        index: int,
+        max_owned: int,
+    ):
+        """One signed-in user with their own subdomains"""
+        self.client = client
+        self.code = f"{run_tag}-{index}"
+        github.add_user(
+            self.code,
+            github_id=int(run_tag, 16) % 100000 * 1000 + index,
+            login=f"bench-{run_tag}-{index}",
+        )
+        self.name_prefix = f"b{run_tag}u{index}n"
+        self.max_owned = max_owned
+        self.headers: Dict[str, str] = {}
+        # Subdomain ID to name
+        self.owned: Dict[int, str] = {}
+        self.created = 0
+
+    def pick(self, operation: str) -> str:
+        """Swap operations that cannot run in the user's current state"""
+        if operation in ("update", "delete") and not self.owned:
+            return "create"
+        if operation == "create" and len(self.owned) >= self.max_owned:
+            return "delete"
+        return operation
+
+    async def login(self) -> httpx.Response:
+        response = await self.client.get(
+            "/api/v1/auth/github/callback", params={"code": self.code}
+        )
+        token = response.headers.get("location", "").partition("token=")[2]
+        if token:
+            self.headers = {"Authorization": f"Bearer {token}"}
+        return response
+
+    async def list(self) -> httpx.Response:
+        return await self.client.get("/api/v1/subdomains/", headers=self.headers)
+
+    async def create(self) -> httpx.Response:
+        self.created += 1
+        name = f"{self.name_prefix}{self.created}"
+        response = await self.client.post(
+            "/api/v1/subdomains/",
+            headers=self.headers,
+            json={"subdomain": name, "target_domain": "bench.netlify.app"},
+        )
+        if response.status_code == 202:
+            self.owned[response.json()["subdomain_id"]] = name
+        return response
+
+    async def update(self) -> httpx.Response:
+        subdomain_id = random.choice(list(self.owned))
+        return await self.client.put(
+            f"/api/v1/subdomains/{subdomain_id}",
+            headers=self.headers,
+            json={
+                "subdomain": self.owned[subdomain_id],
+                "target_domain": f"bench-{random.randrange(1000)}.netlify.app",
+            },
+        )
+
+    async def delete(self) -> httpx.Response:
+        subdomain_id = random.choice(list(self.owned))
+        response = await self.client.delete(
+            f"/api/v1/subdomains/{subdomain_id}", headers=self.headers
+        )
+        # 409 while its record is still being created, the row stays
+        if response.status_code != 409:
+            del self.owned[subdomain_id]
+        return response
+
+
+async def run_user(
+    user: VirtualUser,
+    weights: Dict[str, int],
+    deadline: float,
+    samples: Dict[str, List[float]],
+    errors: Dict[str, int],
+) -> None:
+    operation = "login"
+    while time.perf_counter() < deadline:
+        start_time = time.perf_counter()
+        try:
+            response = await getattr(user, operation)()
+            failed = response.is_error
+        except httpx.HTTPError:
+            failed = True
+        samples[operation].append(time.perf_counter() - start_time)
+        errors[operation] += failed
+        operation = user.pick(
+            random.choices(list(weights), weights=list(weights.values()))[0]
+        )
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+def summarize(
+    samples: Dict[str, List[float]], errors: Dict[str, int], elapsed: float
+) -> Dict[str, Any]:
+    operations = {}
+    for operation, values in samples.items():
+        if not values:
+            continue
+        values = sorted(values)
+        operations[operation] = {
+            "requests": len(values),
+            "errors": errors[operation],
+            "rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2),
+        }
+    everything = sorted(value for values in samples.values() for value in values)
+    total = {
+        "requests": len(everything),
+        "errors": sum(errors.values()),
+        "rps": round(len(everything) / elapsed, 2),
+        "p50_ms": round(percentile(everything, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(everything, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(everything, 0.99) * 1000, 2),
+        "max_ms": round(everything[-1] * 1000, 2),
+    }
+    return {"total": total, "operations": operations}
+
+
+async def run_load(
+    api_url: str, github: FakeGitHub, args: argparse.Namespace, max_owned: int
+) -> Dict[str, Any]:
+    run_tag = uuid.uuid4().hex[:6]
+    samples: Dict[str, List[float]] = {operation: [] for operation in OPERATIONS}
+    errors: Dict[str, int] = {operation: 0 for operation in OPERATIONS}
+    async with httpx.AsyncClient(
+        base_url=api_url,
+        limits=httpx.Limits(max_connections=args.users),
+        timeout=30.0,
+    ) as client:
+        users = [
+            VirtualUser(client, github, run_tag, index, max_owned)
+            for index in range(args.users)
+        ]
+        start_time = time.perf_counter()
+        deadline = start_time + args.duration
+        await asyncio.gather(
+            *(run_user(user, args.mix, deadline, samples, errors) for user in users)
+        )
+        elapsed = time.perf_counter() - start_time
+    return summarize(samples, errors, elapsed)
+
+
+def current_commit() -> str:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=current_dir,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=current_dir,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def previous_result(results_dir: str) -> Optional[str]:
+    if not os.path.isdir(results_dir):
+        return None
+    names = sorted(n for n in os.listdir(results_dir) if n.endswith(".json"))
+    return os.path.join(results_dir, names[-1]) if names else None
+
+
+def print_report(result: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    def change(key: str, operation: str, value: float) -> str:
+        if baseline is None:
+            return ""
+        before = (
+            baseline["total"]
+            if operation == "total"
+            else baseline["operations"].get(operation)
+        )
+        if not before or not before[key]:
+            return ""
+        return f" ({(value - before[key]) / before[key]:+.0%})"
+
+    if baseline is not None:
+        print(f"compared with {baseline['commit']} ({baseline['timestamp']})")
+        if baseline["config"] != result["config"]:
+            print("  warning: the baseline ran with a different configuration")
+    print(
+        f"{'operation':<10}{'requests':>10}{'errors':>8}{'rps':>16}"
+        f"{'p50 ms':>18}{'p95 ms':>18}{'p99 ms':>18}"
+    )
+    rows = [*result["operations"].items(), ("total", result["total"])]
+    for operation, stats in rows:
+        cells = [
+            f"{stats[key]:.1f}{change(key, operation, stats[key])}"
+            for key in ("rps", "p50_ms", "p95_ms", "p99_ms")
+        ]
+        print(
+            f"{operation:<10}{stats['requests']:>10}{stats['errors']:>8}"
+            + "".join(
+                f"{cell:>{width}}" for cell, width in zip(cells, (16, 18, 18, 18))
+            )
+        )
+
+
+def main(args: argparse.Namespace) -> None:
+    fake_netlify = FakeNetlify(
+        domain=os.environ["NETLIFY_DOMAIN"], latency=args.netlify_latency
+    )
+    fake_github = FakeGitHub(latency=args.github_latency)
+    with serve(fake_netlify.app) as netlify_url, serve(fake_github.app) as github_url:
+        os.environ.update(
+            {
+                "NETLIFY_API_URL": f"{netlify_url}/api/v1",
+                "GITHUB_OAUTH_URL": github_url,
+                "GITHUB_API_URL": github_url,
+                "RATE_LIMIT_AUTH": "1000000/minute",
+                "RATE_LIMIT_DNS": "1000000/minute",
+                "NETLIFY_REQUESTS_PER_MINUTE": "1000000",
+                "LOG_LEVEL": "WARNING",
+            }
+        )
+        # Settings are read at import, so the app is imported once the
+        # stand-ins are up and the environment points at them
+        from get_fosscu_domain.app import app
+        from get_fosscu_domain.postgres import Base, engine
+        from get_fosscu_domain.subdomain.endpoints import \
+            MAX_SUBDOMAINS_PER_USER
+
+        Base.metadata.create_all(bind=engine)
+        with serve(app) as api_url:
+            summary = asyncio.run(
+                run_load(api_url, fake_github, args, MAX_SUBDOMAINS_PER_USER - 1)
+            )
+
+    result = {
+        "commit": current_commit(),
+        "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "config": {
+            "users": args.users,
+            "duration_s": args.duration,
+            "netlify_latency_s": args.netlify_latency,
+            "github_latency_s": args.github_latency,
+            "mix": args.mix,
+            "database": engine.dialect.name,
+        },
+        **summary,
+    }
+
+    baseline_path = args.compare or previous_result(args.results_dir)
+    baseline = None
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    path = os.path.join(
+        args.results_dir,
+        f"{result['timestamp'].replace(':', '')}-{result['commit']}.json",
+    )
+    with open(path, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"saved: {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=20, help="Concurrent users")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds")
+    parser.add_argument("--netlify-latency", type=float, default=0.05)
+    parser.add_argument("--github-latency", type=float, default=0.1)
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=parse_mix(DEFAULT_MIX),
+        help=f"Operation weights (default: {DEFAULT_MIX})",
+    )
+    parser.add_argument("--results-dir", default=RESULTS_DIR)
+    parser.add_argument(
+        "--compare", help="Result file to compare with (default: the latest)"
+    )
+    main(parser.parse_args())
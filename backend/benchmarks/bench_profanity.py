@@ -0,0 +1,63 @@
+"""
+Throughput of the profanity check over generated subdomain labels, against
+the previous split-and-compare implementation.
+
+    python benchmarks/bench_profanity.py [names]
+"""
+
+import os
+import random
+import re
+import sys
+import time
+
+# Add the src directory to Python path
+current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(current_dir, "src"))
+
+from get_fosscu_domain.utils.profanity_filter import (BAD_WORD_LIST,
+                                                      is_profanity_found)
+
+SYLLABLES = ["dev", "app", "web", "io", "lab", "hub", "site", "api", "cloud", "ops"]
+
+
+def legacy_is_profanity_found(text: str) -> bool:
+    words = set(re.split(r"\W+", text.lower()))
+    return not words.isdisjoint(BAD_WORD_LIST)
+
+
+def generate_names(count: int) -> list:
+    rng = random.Random(42)
+    words = SYLLABLES + [w.replace(" ", "-") for w in BAD_WORD_LIST[::10]]
+    names = []
+    for _ in range(count):
+        parts = [rng.choice(words) for _ in range(rng.randint(1, 4))]
+        separator = rng.choice(["-", ""])
+        name = separator.join(parts) + (
+            str(rng.randint(0, 99)) if rng.random() < 0.3 else ""
+        )
+        names.append(name[:63])
+    return names
+
+
+def run(check, names) -> tuple:
+    start = time.perf_counter()
+    flagged = sum(1 for name in names if check(name))
+    return time.perf_counter() - start, flagged
+
+
+def main(count: int) -> None:
+    names = generate_names(count)
+    for label, check in [
+        ("legacy set split", legacy_is_profanity_found),
+        ("aho-corasick", is_profanity_found),
+    ]:
+        elapsed, flagged = run(check, names)
+        print(
+            f"{label:18} {elapsed:7.3f}s  {count / elapsed:10.0f} names/s  "
+            f"{elapsed / count * 1e6:6.2f} us/name  flagged {flagged}"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,94 @@
+"""
+Wall time of a DNS/database reconciliation run over a large zone, against a
+local fake Netlify and a throwaway SQLite database.
+
+    python benchmarks/bench_reconcile.py [records]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Add the src and test directories to Python path
+current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(current_dir, "src"))
+sys.path.append(os.path.join(current_dir, "test"))
+
+_db_dir = tempfile.mkdtemp()
+for name, value in {
+    "NETLIFY_ACCESS_KEY": "bench",
+    "POSTGRES_DB_URL": f"sqlite:///{_db_dir}/bench_reconcile.db",
+    "SECRET_KEY": "bench-secret",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+    "GITHUB_CLIENT_ID": "bench",
+    "GITHUB_CLIENT_SECRET": "bench",
+    "NETLIFY_DOMAIN_ZONE_ID": "zone-1",
+    "NETLIFY_DOMAIN": "fosscu.org",
+    "BASE_DOMAIN": "fosscu.org",
+}.items():
+    os.environ.setdefault(name, value)
+
+from fake_netlify import FakeNetlify, serve
+from get_fosscu_domain.models.dns_operation import DnsOperation  # noqa: F401
+from get_fosscu_domain.models.subdomain import Subdomain
+from get_fosscu_domain.models.user import User
+from get_fosscu_domain.postgres import AsyncSessionLocal, Base, engine
+from get_fosscu_domain.subdomain.reconcile import reconcile
+from get_fosscu_domain.utils.netlify import AsyncNetlify
+from sqlalchemy import insert
+
+
+def seed(fake: FakeNetlify, count: int) -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    rows = []
+    for i in range(count):
+        name = f"site-{i:06d}"
+        rows.append(
+            {
+                "subdomain": name,
+                "target_domain": f"{name}.netlify.app",
+                "record_type": "CNAME",
+                "ttl": 3600,
+                "user_id": "bench-user",
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        # Leave 1% of rows without a record and point 1% elsewhere
+        if i % 100 == 1:
+            continue
+        target = "elsewhere.app" if i % 100 == 2 else f"{name}.netlify.app"
+        fake.add_record(f"{name}.fosscu.org", target)
+    for i in range(count // 100):
+        fake.add_record(f"stray-{i:06d}.fosscu.org", "stray.app")
+    with engine.begin() as conn:
+        conn.execute(insert(User).values(id="bench-user", github_id=1))
+        conn.execute(insert(Subdomain), rows)
+
+
+async def run(base_url: str):
+    async with AsyncNetlify("bench", base_url=base_url) as netlify:
+        return await reconcile(AsyncSessionLocal, netlify, "fosscu.org")
+
+
+def main(count: int) -> None:
+    fake = FakeNetlify(domain="fosscu.org")
+    seed(fake, count)
+    with serve(fake.app) as base_url:
+        start = time.perf_counter()
+        report = asyncio.run(run(f"{base_url}/api/v1"))
+        elapsed = time.perf_counter() - start
+
+    print(f"rows: {report.rows}  records: {report.records}")
+    print(f"drift: {report.stats()}")
+    print(f"elapsed: {elapsed:.2f}s ({report.rows / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -18,6 +18,7 @@ from get_fosscu_domain.postgres import Base
 # Import all your models here
 from get_fosscu_domain.models.user import User
 from get_fosscu_domain.models.subdomain import Subdomain
+from get_fosscu_domain.models.dns_operation import DnsOperation
 
 from get_fosscu_domain.config import get_settings
 
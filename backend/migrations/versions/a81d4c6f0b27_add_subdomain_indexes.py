@@ -0,0 +1,31 @@
+"""Add subdomain indexes
+
+Revision ID: a81d4c6f0b27
+Revises: 3c9e2f71a5d4
+Create Date: 2026-10-18 14:03:27.912844
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a81d4c6f0b27'
+down_revision: Union[str, None] = '3c9e2f71a5d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Built concurrently on Postgres so the table stays writable meanwhile
+    with op.get_context().autocommit_block():
+        op.create_index('ix_subdomains_user_id_created_at', 'subdomains', ['user_id', 'created_at'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_subdomains_lower_subdomain', 'subdomains', [sa.text('lower(subdomain)')], unique=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_subdomains_lower_subdomain', table_name='subdomains', postgresql_concurrently=True)
+        op.drop_index('ix_subdomains_user_id_created_at', table_name='subdomains', postgresql_concurrently=True)
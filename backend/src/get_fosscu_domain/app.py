@@ -1,17 +1,31 @@
+import asyncio
 import logging
-from logging.config import dictConfig
+import math
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException, Request, Response
+import httpx
+from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from .api import router
-from .logging import LogConfig
-from .postgres import Base, engine
+from .auth.auth import token_cache, user_cache
+from .config import get_settings
+from .health.prober import HealthProber
+from .logging import RequestLoggingMiddleware, configure_logging
+from .metrics import (AppStatsCollector, MetricsMiddleware, instrument_engine,
+                      metrics_endpoint, register_app_stats)
+from .postgres import AsyncSessionLocal, async_engine, get_pool_stats
 from .rate_limiting import (RateLimitExceeded, limiter,
                             rate_limit_exceeded_handler)
-
-dictConfig(LogConfig())
+from .subdomain.availability import name_index, reload_name_index
+from .subdomain.outbox import OutboxWorker
+from .subdomain.reconcile import run_reconciliation
+from .tracing import TracingMiddleware, init_tracing, trace_engine
+from .utils.netlify import (AsyncNetlify, CircuitOpenError,
+                            reconcile_record_index, warm_up)
+
+configure_logging()
 logger = logging.getLogger("get_fosscu_domain")
 
 
@@ -28,10 +42,93 @@ def configure_cors(app: FastAPI) -> None:
     )
 
 
+def configure_metrics(app: FastAPI) -> None:
+    app.add_middleware(MetricsMiddleware)
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+    instrument_engine(async_engine.sync_engine)
+    register_app_stats(
+        AppStatsCollector(
+            pool_stats=get_pool_stats,
+            caches={"token": token_cache, "user": user_cache},
+            name_index=name_index,
+            netlify=lambda: getattr(app.state, "netlify", None),
+        )
+    )
+
+
+def configure_tracing(app: FastAPI) -> None:
+    app.state.tracer_provider = init_tracing(get_settings())
+    app.add_middleware(TracingMiddleware)
+    trace_engine(async_engine.sync_engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled Netlify client is shared by every request for the app lifetime
+    settings = get_settings()
+    app.state.netlify = AsyncNetlify.from_settings(settings)
+    # Resolve the zone IDs and load their records once up front so requests
+    # start on a warm cache
+    await warm_up(
+        app.state.netlify, list({settings.NETLIFY_DOMAIN, settings.BASE_DOMAIN})
+    )
+    try:
+        await name_index.load(AsyncSessionLocal)
+    except Exception as e:
+        logger.error(f"Could not load subdomain names: {str(e)}")
+    app.state.outbox_worker = OutboxWorker.from_settings(
+        settings, AsyncSessionLocal, app.state.netlify
+    )
+    # Readiness probes read the prober's last result; check once before
+    # serving so the first probe already has one
+    app.state.health_prober = HealthProber.from_settings(
+        settings, AsyncSessionLocal, app.state.netlify
+    )
+    await app.state.health_prober.probe()
+    background_tasks = [
+        asyncio.create_task(app.state.outbox_worker.run()),
+        asyncio.create_task(
+            run_reconciliation(
+                AsyncSessionLocal,
+                app.state.netlify,
+                settings.NETLIFY_DOMAIN,
+                settings.RECONCILE_INTERVAL,
+                repair=settings.RECONCILE_REPAIR,
+            )
+        ),
+        asyncio.create_task(
+            reconcile_record_index(
+                app.state.netlify, settings.NETLIFY_RECORD_SYNC_INTERVAL
+            )
+        ),
+        asyncio.create_task(
+            reload_name_index(
+                name_index, AsyncSessionLocal, settings.SUBDOMAIN_NAME_SYNC_INTERVAL
+            )
+        ),
+        asyncio.create_task(app.state.health_prober.run()),
+    ]
+    try:
+        yield
+    finally:
+        for task in background_tasks:
+            task.cancel()
+        await app.state.netlify.close()
+        tracer_provider = getattr(app.state, "tracer_provider", None)
+        if tracer_provider is not None:
+            tracer_provider.shutdown()
+
+
 def create_app() -> FastAPI:
-    app = FastAPI(title="get_fosscu_domain")
+    app = FastAPI(title="get_fosscu_domain", lifespan=lifespan)
     # app = FastAPI(title="get_fosscu_domain", docs_url=None, redoc_url="/docs")
     configure_cors(app=app)
+    if get_settings().METRICS_ENABLED:
+        configure_metrics(app=app)
+    if get_settings().TRACING_ENABLED:
+        configure_tracing(app=app)
+    # Outermost, so the request ID is set before anything else logs
+    app.add_middleware(RequestLoggingMiddleware)
 
     app.include_router(router=router)
 
@@ -41,6 +138,38 @@ def create_app() -> FastAPI:
     async def http_exception_handler(request: Request, exc: HTTPException):
         return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
 
+    @app.exception_handler(httpx.HTTPStatusError)
+    async def netlify_status_error_handler(
+        request: Request, exc: httpx.HTTPStatusError
+    ):
+        # Netlify still throttling or failing once retries ran out is a
+        # temporary outage, anything else is a bad upstream answer
+        response = exc.response
+        if (
+            response.status_code == httpx.codes.TOO_MANY_REQUESTS
+            or response.is_server_error
+        ):
+            headers = {}
+            if "Retry-After" in response.headers:
+                headers["Retry-After"] = response.headers["Retry-After"]
+            return JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"detail": "DNS provider is unavailable, try again later"},
+                headers=headers,
+            )
+        return JSONResponse(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            content={"detail": "DNS provider rejected the request"},
+        )
+
+    @app.exception_handler(CircuitOpenError)
+    async def circuit_open_handler(request: Request, exc: CircuitOpenError):
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "DNS provider is unavailable, try again later"},
+            headers={"Retry-After": str(math.ceil(exc.retry_after))},
+        )
+
     return app
 
 
@@ -1,15 +1,20 @@
 # auth.py
+import hashlib
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..config import get_settings
+from ..logging import bind_log_context
 from ..models.user import User
-from ..postgres import get_db
+from ..postgres import get_async_db
+from ..utils.cache import TTLCache
 
 # Configuration
 SECRET_KEY = get_settings().SECRET_KEY
@@ -18,6 +23,17 @@ ACCESS_TOKEN_EXPIRE_MINUTES = get_settings().ACCESS_TOKEN_EXPIRE_MINUTES
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# Verified JWT claims keyed by the token's SHA-256 digest
+token_cache = TTLCache(
+    maxsize=get_settings().TOKEN_CACHE_SIZE, ttl=get_settings().TOKEN_CACHE_TTL
+)
+
+# Authenticated users keyed by github_id. Other workers only see a GitHub
+# callback update once the entry expires, so keep the TTL short.
+user_cache = TTLCache(
+    maxsize=get_settings().USER_CACHE_SIZE, ttl=get_settings().USER_CACHE_TTL
+)
+
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -30,8 +46,28 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
+def decode_access_token(token: str) -> dict:
+    """
+    Verify and decode a JWT. Claims of tokens verified recently are reused
+    until the token's own `exp`, skipping the signature check.
+    """
+    digest = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(digest)
+    if payload is not None:
+        return payload
+
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    expires_at = payload.get("exp")
+    token_cache.set(
+        digest,
+        payload,
+        ttl=expires_at - time.time() if expires_at is not None else None,
+    )
+    return payload
+
+
 async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
 ):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -39,14 +75,32 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_access_token(token)
         github_id: str = payload.get("sub")
         if github_id is None:
             raise credentials_exception
-    except JWTError:
+        # asyncpg does not coerce strings for integer columns
+        github_id = int(github_id)
+    except (JWTError, ValueError):
         raise credentials_exception
 
-    user = db.query(User).filter(User.github_id == github_id).first()
+    user = user_cache.get(github_id)
     if user is None:
-        raise credentials_exception
+        user = await db.scalar(select(User).where(User.github_id == github_id))
+        if user is None:
+            raise credentials_exception
+        user_cache.set(github_id, user)
+    bind_log_context(user_id=user.id)
     return user
+
+
+def is_admin(user: User) -> bool:
+    return user.github_id in get_settings().ADMIN_GITHUB_IDS
+
+
+async def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    if not is_admin(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required"
+        )
+    return current_user
@@ -1,21 +1,27 @@
 import httpx
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import (APIRouter, Depends, HTTPException, Request, Response,
+                     status)
 from fastapi.responses import RedirectResponse
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..auth.auth import create_access_token, get_current_user
+from ..auth.auth import create_access_token, get_current_user, user_cache
 from ..auth.schema import GithubLoginResponse, UserResponse
 from ..config import get_settings
+from ..metrics import GITHUB_REQUEST_LATENCY
 from ..models.user import User
-from ..postgres import get_db
+from ..postgres import get_async_db
 from ..rate_limiting import limiter
+from ..tracing import span
 
 router = APIRouter(tags=["auth"])
 
 # GitHub OAuth Configuration
 GITHUB_CLIENT_ID = get_settings().GITHUB_CLIENT_ID
 GITHUB_CLIENT_SECRET = get_settings().GITHUB_CLIENT_SECRET
+GITHUB_OAUTH_URL = get_settings().GITHUB_OAUTH_URL
+GITHUB_API_URL = get_settings().GITHUB_API_URL
 GITHUB_REDIRECT_URI = "http://localhost:8000/api/v1/auth/github/callback"
 FRONTEND_URL = "http://localhost:5173"
 
@@ -26,13 +32,13 @@ FRONTEND_URL = "http://localhost:5173"
     status_code=status.HTTP_200_OK,
     description="Initiates GitHub OAuth flow",
 )
-@limiter.limit("50/minute")
-async def github_login(request: Request) -> GithubLoginResponse:
+@limiter.limit(get_settings().RATE_LIMIT_AUTH)
+async def github_login(request: Request, response: Response) -> GithubLoginResponse:
     """
     Returns the GitHub OAuth authorization URL.
     """
     return GithubLoginResponse(
-        url=f"https://github.com/login/oauth/authorize?client_id={GITHUB_CLIENT_ID}&redirect_uri={GITHUB_REDIRECT_URI}"
+        url=f"{GITHUB_OAUTH_URL}/login/oauth/authorize?client_id={GITHUB_CLIENT_ID}&redirect_uri={GITHUB_REDIRECT_URI}"
     )
 
 
@@ -45,8 +51,10 @@ async def github_login(request: Request) -> GithubLoginResponse:
     },
     description="Handles GitHub OAuth callback and redirects to frontend",
 )
-@limiter.limit("50/minute")
-async def github_callback(request: Request, code: str, db: Session = Depends(get_db)):
+@limiter.limit(get_settings().RATE_LIMIT_AUTH)
+async def github_callback(
+    request: Request, code: str, db: AsyncSession = Depends(get_async_db)
+):
     """
     Handles GitHub OAuth callback:
     1. Exchanges code for access token
@@ -57,16 +65,19 @@ async def github_callback(request: Request, code: str, db: Session = Depends(get
     try:
         # Exchange code for access token
         async with httpx.AsyncClient() as client:
-            token_response = await client.post(
-                "https://github.com/login/oauth/access_token",
-                headers={"Accept": "application/json"},
-                data={
-                    "client_id": GITHUB_CLIENT_ID,
-                    "client_secret": GITHUB_CLIENT_SECRET,
-                    "code": code,
-                    "redirect_uri": GITHUB_REDIRECT_URI,
-                },
-            )
+            with span("github.access_token"), GITHUB_REQUEST_LATENCY.labels(
+                "access_token"
+            ).time():
+                token_response = await client.post(
+                    f"{GITHUB_OAUTH_URL}/login/oauth/access_token",
+                    headers={"Accept": "application/json"},
+                    data={
+                        "client_id": GITHUB_CLIENT_ID,
+                        "client_secret": GITHUB_CLIENT_SECRET,
+                        "code": code,
+                        "redirect_uri": GITHUB_REDIRECT_URI,
+                    },
+                )
 
             if token_response.status_code != 200:
                 raise HTTPException(
@@ -84,13 +95,14 @@ async def github_callback(request: Request, code: str, db: Session = Depends(get
                 )
 
             # Get user info from GitHub
-            user_response = await client.get(
-                "https://api.github.com/user",
-                headers={
-                    "Authorization": f"Bearer {access_token}",
-                    "Accept": "application/json",
-                },
-            )
+            with span("github.user"), GITHUB_REQUEST_LATENCY.labels("user").time():
+                user_response = await client.get(
+                    f"{GITHUB_API_URL}/user",
+                    headers={
+                        "Authorization": f"Bearer {access_token}",
+                        "Accept": "application/json",
+                    },
+                )
 
             if user_response.status_code != 200:
                 raise HTTPException(
@@ -101,7 +113,9 @@ async def github_callback(request: Request, code: str, db: Session = Depends(get
             user_data = user_response.json()
 
             # Create or update user in database
-            user = db.query(User).filter(User.github_id == user_data["id"]).first()
+            user = await db.scalar(
+                select(User).where(User.github_id == user_data["id"])
+            )
             if not user:
                 user = User(
                     github_id=user_data["id"],
@@ -115,7 +129,8 @@ async def github_callback(request: Request, code: str, db: Session = Depends(get
                 user.access_token = access_token
                 user.avatar_url = user_data["avatar_url"]
 
-            db.commit()
+            await db.commit()
+            user_cache.invalidate(user.github_id)
 
             # Create JWT token
             jwt_token = create_access_token(data={"sub": str(user.github_id)})
@@ -139,9 +154,11 @@ async def github_callback(request: Request, code: str, db: Session = Depends(get
     responses={401: {"description": "Not authenticated"}},
     description="Get current user profile",
 )
-@limiter.limit("50/minute")
+@limiter.limit(get_settings().RATE_LIMIT_AUTH)
 async def read_users_me(
-    request: Request, current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
 ) -> UserResponse:
     """
     Returns the profile of the currently authenticated user.
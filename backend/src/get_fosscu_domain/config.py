@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import List
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -15,6 +16,97 @@ class Config(BaseSettings):
     NETLIFY_DOMAIN: str
     BASE_DOMAIN: str
 
+    # GitHub OAuth and REST API endpoints, overridable for GitHub Enterprise
+    # or a local stand-in
+    GITHUB_OAUTH_URL: str = "https://github.com"
+    GITHUB_API_URL: str = "https://api.github.com"
+
+    # GitHub user IDs allowed to use the admin endpoints
+    ADMIN_GITHUB_IDS: List[int] = []
+
+    # Verified JWT cache
+    TOKEN_CACHE_SIZE: int = 4096
+    TOKEN_CACHE_TTL: float = 300.0
+
+    # Rate limiting
+    RATE_LIMIT_STORAGE_URI: str = "memory://"
+    RATE_LIMIT_STRATEGY: str = "sliding-window-counter"
+    RATE_LIMIT_AUTH: str = "50/minute"
+    RATE_LIMIT_HEALTH: str = "50/minute"
+    RATE_LIMIT_DNS: str = "60/minute"
+
+    # Authenticated user cache
+    USER_CACHE_SIZE: int = 1024
+    USER_CACHE_TTL: float = 60.0
+
+    # Seconds between reloads of the in-memory taken-name set
+    SUBDOMAIN_NAME_SYNC_INTERVAL: float = 60.0
+
+    # Database connection pool
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # Netlify API connection pool
+    NETLIFY_API_URL: str = "https://api.netlify.com/api/v1"
+    NETLIFY_HTTP2: bool = True
+    NETLIFY_MAX_CONNECTIONS: int = 20
+    NETLIFY_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    NETLIFY_KEEPALIVE_EXPIRY: float = 30.0
+    NETLIFY_TIMEOUT: float = 10.0
+    NETLIFY_CONNECT_TIMEOUT: float = 5.0
+    NETLIFY_ZONE_CACHE_TTL: float = 3600.0
+    NETLIFY_RECORD_SYNC_INTERVAL: float = 300.0
+    NETLIFY_BATCH_CONCURRENCY: int = 8
+
+    # Netlify API throttling and retries
+    NETLIFY_REQUESTS_PER_MINUTE: int = 500
+    NETLIFY_REQUEST_BURST: int = 25
+    NETLIFY_MAX_RETRIES: int = 3
+    NETLIFY_RETRY_BACKOFF: float = 0.5
+    NETLIFY_RETRY_MAX_DELAY: float = 30.0
+
+    # DNS outbox worker
+    OUTBOX_POLL_INTERVAL: float = 5.0
+    OUTBOX_BATCH_SIZE: int = 20
+    OUTBOX_MAX_ATTEMPTS: int = 8
+    OUTBOX_RETRY_BACKOFF: float = 2.0
+    OUTBOX_RETRY_MAX_DELAY: float = 300.0
+    OUTBOX_LEASE: float = 60.0
+
+    # Seconds between DNS/database reconciliation runs, and whether they
+    # repair what they find (orphan records are only ever reported)
+    RECONCILE_INTERVAL: float = 3600.0
+    RECONCILE_REPAIR: bool = False
+
+    # Seconds between background dependency checks behind /readyz, and how
+    # long each check may take
+    HEALTH_PROBE_INTERVAL: float = 5.0
+    HEALTH_PROBE_TIMEOUT: float = 2.0
+
+    # Netlify circuit breaker
+    NETLIFY_BREAKER_FAILURE_THRESHOLD: int = 5
+    NETLIFY_BREAKER_RESET_TIMEOUT: float = 30.0
+    NETLIFY_BREAKER_SLOW_CALL_THRESHOLD: float = 5.0
+
+    # Application log level, and JSON lines instead of colored text
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+
+    # Serve Prometheus metrics on /metrics
+    METRICS_ENABLED: bool = True
+
+    # OpenTelemetry tracing, needs the 'tracing' extra. TRACING_EXPORTER is
+    # "otlp" (OTLP over HTTP to TRACING_OTLP_ENDPOINT) or "file" (JSON lines)
+    TRACING_ENABLED: bool = False
+    TRACING_SERVICE_NAME: str = "get_fosscu_domain"
+    TRACING_SAMPLE_RATIO: float = 0.1
+    TRACING_EXPORTER: str = "otlp"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACING_FILE_PATH: str = "traces.jsonl"
+
     model_config = SettingsConfigDict(env_file=".env")
 
 
@@ -1,12 +1,17 @@
 import time
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import (APIRouter, Depends, HTTPException, Request, Response,
+                     status)
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..health.schema import HealthErrorResponse, HealthResponse
-from ..postgres import get_db
+from ..config import get_settings
+from ..health.prober import HealthProber
+from ..health.schema import (DbPoolStats, DependencyCheck, HealthErrorResponse,
+                             HealthResponse, LivenessResponse,
+                             NetlifyClientStats, ReadinessResponse)
+from ..postgres import get_async_db, get_pool_stats
 from ..rate_limiting import limiter
 
 router = APIRouter(tags=["health"])
@@ -20,13 +25,16 @@ router = APIRouter(tags=["health"])
         503: {"model": HealthErrorResponse, "description": "Database connection failed"}
     },
 )
-@limiter.limit("50/minute")
-async def healthz(request: Request, db: Session = Depends(get_db)) -> HealthResponse:
+@limiter.limit(get_settings().RATE_LIMIT_HEALTH)
+async def healthz(
+    request: Request, response: Response, db: AsyncSession = Depends(get_async_db)
+) -> HealthResponse:
     """
     Health check endpoint that verifies database connectivity.
 
     Returns:
-        HealthResponse: Contains database response time in milliseconds
+        HealthResponse: Contains database response time in milliseconds and
+            connection pool usage
 
     Raises:
         HTTPException (503): When database connection fails
@@ -36,13 +44,18 @@ async def healthz(request: Request, db: Session = Depends(get_db)) -> HealthResp
         start_time = time.perf_counter()  # More precise than time.time()
 
         # Execute a simple query to check database connectivity
-        db.execute(text("SELECT 1"))
-        db.commit()  # Ensure connection is properly released
+        await db.execute(text("SELECT 1"))
+        await db.commit()  # Ensure connection is properly released
 
         end_time = time.perf_counter()
         response_time = round((end_time - start_time) * 1000, 2)
 
-        return HealthResponse(db_response_time_ms=response_time)
+        netlify = getattr(request.app.state, "netlify", None)
+        return HealthResponse(
+            db_response_time_ms=response_time,
+            db_pool=DbPoolStats(**get_pool_stats()),
+            netlify=NetlifyClientStats(**netlify.stats()) if netlify else None,
+        )
 
     except SQLAlchemyError as e:
         # Specifically catch database-related errors
@@ -60,3 +73,51 @@ async def healthz(request: Request, db: Session = Depends(get_db)) -> HealthResp
                 error_message=f"Unexpected error during health check: {str(e)}"
             ).model_dump(),
         )
+
+
+@router.get("/livez", status_code=status.HTTP_200_OK, response_model=LivenessResponse)
+async def livez() -> LivenessResponse:
+    """
+    Liveness probe: answers as long as the event loop is serving requests.
+    Checks no dependency, so an outage never gets the process restarted.
+    """
+    return LivenessResponse()
+
+
+@router.get(
+    "/readyz",
+    status_code=status.HTTP_200_OK,
+    response_model=ReadinessResponse,
+    responses={
+        503: {"model": ReadinessResponse, "description": "Not ready for traffic"}
+    },
+)
+async def readyz(request: Request, response: Response) -> ReadinessResponse:
+    """
+    Readiness probe. Reports the background prober's last database and
+    Netlify checks plus the in-memory pool and circuit breaker state, so
+    probes cost no database or Netlify call and need no rate limit.
+
+    Returns:
+        ReadinessResponse: 200 when ready or degraded (Netlify unreachable),
+            503 when the database check failed or is stale
+    """
+    prober = getattr(request.app.state, "health_prober", None)
+    result = prober.last_result if prober else None
+    readiness = prober.status() if prober else HealthProber.NOT_READY
+    if readiness == HealthProber.NOT_READY:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    netlify = getattr(request.app.state, "netlify", None)
+    return ReadinessResponse(
+        status=readiness,
+        checked_at=result["checked_at"] if result else None,
+        database=DependencyCheck(**result["database"]) if result else None,
+        netlify_reachable=(
+            DependencyCheck(**result["netlify"])
+            if result and result["netlify"]
+            else None
+        ),
+        db_pool=DbPoolStats(**get_pool_stats()),
+        netlify=NetlifyClientStats(**netlify.stats()) if netlify else None,
+    )
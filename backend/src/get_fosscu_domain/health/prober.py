@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from ..config import Config
+from ..utils.netlify import AsyncNetlify
+
+logger = logging.getLogger(__name__)
+
+
+class HealthProber:
+    READY = "ready"
+    DEGRADED = "degraded"
+    NOT_READY = "not_ready"
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        netlify: Optional[AsyncNetlify],
+        interval: float = 5.0,
+        timeout: float = 2.0,
+        max_age: Optional[float] = None,
+    ):
+        """
+        Checks the database and Netlify every `interval` seconds in the
+        background so readiness probes only read the last result, however
+        many nodes are probing. A result older than `max_age` (three
+        intervals by default) counts as failed: the prober itself is stuck.
+        """
+        self.session_factory = session_factory
+        self.netlify = netlify
+        self.interval = interval
+        self.timeout = timeout
+        self.max_age = max_age if max_age is not None else 3 * interval
+        self.last_result: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: Config,
+        session_factory: async_sessionmaker,
+        netlify: Optional[AsyncNetlify],
+    ) -> "HealthProber":
+        return cls(
+            session_factory,
+            netlify,
+            interval=settings.HEALTH_PROBE_INTERVAL,
+            timeout=settings.HEALTH_PROBE_TIMEOUT,
+        )
+
+    async def _check(self, check) -> Dict[str, Any]:
+        start_time = time.perf_counter()
+        try:
+            await asyncio.wait_for(check(), self.timeout)
+        except asyncio.TimeoutError:
+            return {"ok": False, "error": f"Timed out after {self.timeout}s"}
+        except Exception as e:
+            return {"ok": False, "error": f"{type(e).__name__}: {str(e)}"}
+        return {
+            "ok": True,
+            "response_time_ms": round((time.perf_counter() - start_time) * 1000, 2),
+        }
+
+    async def _ping_database(self) -> None:
+        async with self.session_factory() as db:
+            await db.execute(text("SELECT 1"))
+
+    async def _ping_netlify(self) -> None:
+        # Leave an open breaker alone: probing it would only count rejections
+        self.netlify.breaker.check()
+        await self.netlify.ping()
+
+    async def probe(self) -> Dict[str, Any]:
+        """Check every dependency once and keep the result for readers"""
+        checks = [self._check(self._ping_database)]
+        if self.netlify is not None:
+            checks.append(self._check(self._ping_netlify))
+        database, *netlify = await asyncio.gather(*checks)
+        self.last_result = {
+            "checked_at": time.time(),
+            "database": database,
+            "netlify": netlify[0] if netlify else None,
+        }
+        return self.last_result
+
+    def status(self) -> str:
+        """
+        Not ready without a recent successful database check. Netlify being
+        down only degrades the service: reads keep working and new records
+        wait in the outbox, and taking every replica out of rotation for an
+        outage they all share would not help.
+        """
+        result = self.last_result
+        if (
+            result is None
+            or time.time() - result["checked_at"] > self.max_age
+            or not result["database"]["ok"]
+        ):
+            return self.NOT_READY
+        if result["netlify"] is not None and not result["netlify"]["ok"]:
+            return self.DEGRADED
+        return self.READY
+
+    async def run(self) -> None:
+        """Probe every `interval` seconds; the first probe is the caller's"""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.probe()
+            except Exception as e:
+                logger.error(f"Error probing dependencies: {str(e)}")
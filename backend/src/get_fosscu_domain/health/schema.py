@@ -1,9 +1,40 @@
 import time
-from typing import Literal
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Field
 
 
+class DbPoolStats(BaseModel):
+    """Schema for the request-path database connection pool"""
+
+    checkouts: int
+    checkout_wait_ms_total: float
+    checkout_wait_ms_max: float
+    size: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+
+
+class CircuitBreakerStats(BaseModel):
+    """Schema for the Netlify circuit breaker"""
+
+    state: Literal["closed", "open", "half_open"]
+    consecutive_failures: int
+    times_opened: int
+    rejected: int
+
+
+class NetlifyClientStats(BaseModel):
+    """Schema for retries, client-side throttling and the circuit breaker"""
+
+    requests: int
+    retries: int
+    rate_limited: int
+    throttled: int
+    throttle_wait_s_total: float
+    breaker: CircuitBreakerStats
+
+
 class HealthResponse(BaseModel):
     """Schema for successful health check response"""
 
@@ -11,6 +42,8 @@ class HealthResponse(BaseModel):
     database: Literal["connected"] = "connected"
     timestamp: float = Field(default_factory=time.time)
     db_response_time_ms: float = Field(ge=0)  # Must be greater than or equal to 0
+    db_pool: Optional[DbPoolStats] = None
+    netlify: Optional[NetlifyClientStats] = None
 
 
 class HealthErrorResponse(BaseModel):
@@ -20,3 +53,30 @@ class HealthErrorResponse(BaseModel):
     database: Literal["disconnected"] = "disconnected"
     timestamp: float = Field(default_factory=time.time)
     error_message: str
+
+
+class LivenessResponse(BaseModel):
+    """Schema for the liveness probe, which touches no dependency"""
+
+    status: Literal["ok"] = "ok"
+    timestamp: float = Field(default_factory=time.time)
+
+
+class DependencyCheck(BaseModel):
+    """Schema for the last background check of one dependency"""
+
+    ok: bool
+    response_time_ms: Optional[float] = None
+    error: Optional[str] = None
+
+
+class ReadinessResponse(BaseModel):
+    """Schema for the readiness probe, served from the background prober"""
+
+    status: Literal["ready", "degraded", "not_ready"]
+    timestamp: float = Field(default_factory=time.time)
+    checked_at: Optional[float] = None
+    database: Optional[DependencyCheck] = None
+    netlify_reachable: Optional[DependencyCheck] = None
+    db_pool: DbPoolStats
+    netlify: Optional[NetlifyClientStats] = None
@@ -1,6 +1,86 @@
-from typing import Any, Dict
+import atexit
+import json
+import logging
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.config import dictConfig
+from logging.handlers import QueueHandler
+from typing import Any, Dict, Optional
 
 from pydantic import BaseModel
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import get_settings
+from .metrics import route_template
+
+# Per-request fields every log line carries. A dict rather than one
+# ContextVar per field so code that runs in a copied context (thread pools,
+# tasks) still updates the same request.
+request_context: ContextVar[Optional[Dict[str, Any]]] = ContextVar(
+    "request_context", default=None
+)
+
+# Attributes every LogRecord has; anything else was passed with `extra=`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+access_logger = logging.getLogger("get_fosscu_domain.access")
+
+
+def bind_log_context(**fields: Any) -> None:
+    """Attach fields, e.g. the authenticated user, to the current request's logs"""
+    context = request_context.get()
+    if context is not None:
+        context.update(fields)
+
+
+class RequestContextFilter(logging.Filter):
+    """Copies the current request's fields onto records as they are logged"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = request_context.get()
+        if context is not None:
+            record.request_id = context["request_id"]
+            record.route = route_template(context["scope"])
+            if context.get("user_id") is not None:
+                record.user_id = context["user_id"]
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with request context and `extra=` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc)
+            .isoformat(timespec="milliseconds")
+            .replace("+00:00", "Z"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class LogQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Only merge the message arguments before the record is queued. The
+        stock handler formats the whole record here, on the event loop; this
+        queue never leaves the process, so formatting, exception text
+        included, is left to the listener thread.
+        """
+        record.msg = record.getMessage()
+        record.args = None
+        return record
 
 
 class LogConfig(BaseModel):
@@ -8,25 +88,95 @@ class LogConfig(BaseModel):
 
     LOGGER_NAME: str = "get_fosscu_domain"
     LOG_FORMAT: str = "%(levelprefix)s | %(asctime)s | %(message)s"
-    LOG_LEVEL: str = "DEBUG"
+    LOG_LEVEL: str = get_settings().LOG_LEVEL
 
     # Logging config
     version: int = 1
     disable_existing_loggers: bool = False
+    # Classes of this module are named through __name__, so the config works
+    # whichever package path the app was imported under (src.… in the image)
     formatters: Dict[str, Dict[str, str]] = {
         "default": {
             "()": "uvicorn.logging.DefaultFormatter",
             "fmt": LOG_FORMAT,
             "datefmt": "%Y-%m-%d %H:%M:%S",
         },
+        "json": {"()": f"{__name__}.JsonFormatter"},
+    }
+    filters: Dict[str, Dict[str, str]] = {
+        "request_context": {"()": f"{__name__}.RequestContextFilter"},
     }
+    # Records are queued on the event loop and written by a listener thread,
+    # so a slow stderr never stalls request handling
     handlers: Dict[str, Dict[str, Any]] = {
         "default": {
-            "formatter": "default",
+            "formatter": "json" if get_settings().LOG_JSON else "default",
             "class": "logging.StreamHandler",
             "stream": "ext://sys.stderr",
         },
+        "queue": {
+            "class": f"{__name__}.LogQueueHandler",
+            "handlers": ["default"],
+            "filters": ["request_context"],
+            "respect_handler_level": True,
+        },
     }
     loggers: Dict[str, Dict[str, Any]] = {
-        LOGGER_NAME: {"handlers": ["default"], "level": LOG_LEVEL},
+        LOGGER_NAME: {"handlers": ["queue"], "level": LOG_LEVEL},
     }
+
+
+def configure_logging() -> None:
+    """Apply LogConfig and start the thread that writes queued records"""
+    dictConfig(LogConfig().model_dump())
+    listener = logging.getHandlerByName("queue").listener
+    listener.start()
+    atexit.register(listener.stop)
+
+
+class RequestLoggingMiddleware:
+    def __init__(self, app: ASGIApp):
+        """
+        Gives each request an ID (the caller's X-Request-ID if it sent one),
+        makes it and the route available to every log line of the request,
+        and writes one access log line with status and latency at the end.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:128]
+                break
+        context = {"request_id": request_id or uuid.uuid4().hex, "scope": scope}
+        token = request_context.set(context)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-request-id", context["request_id"].encode("latin-1")),
+                ]
+            await send(message)
+
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            access_logger.info(
+                f"{scope['method']} {scope['path']} {status_code}",
+                extra={
+                    "method": scope["method"],
+                    "status": status_code,
+                    "latency_ms": round((time.perf_counter() - start_time) * 1000, 2),
+                },
+            )
+            request_context.reset(token)
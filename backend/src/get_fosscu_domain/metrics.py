@@ -0,0 +1,269 @@
+"""
+Prometheus metrics for the API, its database and its upstream services.
+
+Latencies are recorded as histograms where they happen; counters the app
+already keeps (pool, caches, Netlify client) are read when /metrics is
+scraped instead of being updated twice on the hot path.
+"""
+
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, Histogram,
+                               generate_latest)
+from prometheus_client.core import (CounterMetricFamily, GaugeMetricFamily,
+                                    Metric)
+from prometheus_client.registry import Collector
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Upstream calls are slower than the API itself, so they get wider buckets
+API_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UPSTREAM_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "API request latency by route template and status code",
+    ["method", "route", "status"],
+    buckets=API_BUCKETS,
+)
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds",
+    "Database statement execution time by statement verb",
+    ["statement"],
+    buckets=FAST_BUCKETS + (0.25, 0.5, 1.0, 2.5),
+)
+NETLIFY_REQUEST_LATENCY = Histogram(
+    "netlify_request_duration_seconds",
+    "Netlify API call time per attempt by HTTP method and status code",
+    ["method", "status"],
+    buckets=UPSTREAM_BUCKETS,
+)
+GITHUB_REQUEST_LATENCY = Histogram(
+    "github_request_duration_seconds",
+    "GitHub OAuth call time by endpoint",
+    ["endpoint"],
+    buckets=UPSTREAM_BUCKETS,
+)
+PROFANITY_CHECK_LATENCY = Histogram(
+    "profanity_check_duration_seconds",
+    "Time spent checking one subdomain label for profanity",
+    buckets=FAST_BUCKETS,
+)
+
+
+# Full route template by id of the matched route object
+_route_templates: Dict[int, str] = {}
+
+
+def route_template(scope: Scope) -> str:
+    """The path template of the route a request matched, e.g. /subdomains/{id}"""
+    route = scope.get("route")
+    template = getattr(route, "path_format", None)
+    if template is None:
+        return "unmatched"
+    cached = _route_templates.get(id(route))
+    if cached is not None:
+        return cached
+    # Routes of an included router may only know their path below the
+    # router's prefix; recover the prefix from the request path
+    try:
+        suffix = template.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = scope["path"]
+    if path.endswith(suffix):
+        template = path[: len(path) - len(suffix)] + template
+    _route_templates[id(route)] = template
+    return template
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        """
+        Times every HTTP request. Requests are labelled with the route
+        template rather than the raw path so IDs in URLs do not create a
+        series each. Plain ASGI so streaming responses are not buffered.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_LATENCY.labels(
+                scope["method"], route_template(scope), str(status_code)
+            ).observe(time.perf_counter() - start_time)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    verb = statement.lstrip().split(None, 1)[0].upper() if statement else ""
+    DB_QUERY_LATENCY.labels(verb).observe(elapsed)
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute
+    if context.connection is not None:
+        starts = context.connection.info.get("query_start_time")
+        if starts:
+            starts.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement the engine sends to the database, once per engine"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class AppStatsCollector(Collector):
+    def __init__(
+        self,
+        pool_stats: Callable[[], Dict[str, Any]],
+        caches: Dict[str, Any],
+        name_index: Any,
+        netlify: Callable[[], Optional[Any]],
+    ):
+        """
+        Exposes the app's own running totals at scrape time
+        Args:
+            pool_stats (callable): Returns the connection pool snapshot
+            caches (dict): Cache name to object with `stats()`
+            name_index: The taken-subdomain-name set
+            netlify (callable): Returns the shared Netlify client, if started
+        """
+        self.pool_stats = pool_stats
+        self.caches = caches
+        self.name_index = name_index
+        self.netlify = netlify
+
+    def collect(self) -> Iterator[Metric]:
+        pool = self.pool_stats()
+        yield CounterMetricFamily(
+            "db_pool_checkouts", "Connections checked out", value=pool["checkouts"]
+        )
+        yield CounterMetricFamily(
+            "db_pool_checkout_wait_seconds",
+            "Time spent waiting for a pooled connection",
+            value=pool["checkout_wait_ms_total"] / 1000,
+        )
+        for key in ("size", "checked_out", "overflow"):
+            if key in pool:
+                yield GaugeMetricFamily(
+                    f"db_pool_{key}", f"Connection pool {key}", value=pool[key]
+                )
+
+        netlify = self.netlify()
+        caches = dict(self.caches)
+        if netlify is not None:
+            caches["netlify_zone"] = netlify.zone_cache
+        hits = CounterMetricFamily("cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "Cache misses", labels=["cache"])
+        entries = GaugeMetricFamily("cache_entries", "Cached entries", labels=["cache"])
+        for name, cache in caches.items():
+            stats = cache.stats()
+            hits.add_metric([name], stats["hits"])
+            misses.add_metric([name], stats["misses"])
+            entries.add_metric([name], stats["size"])
+        yield from (hits, misses, entries)
+
+        yield GaugeMetricFamily(
+            "subdomain_name_index_entries",
+            "Subdomain names held in the in-memory taken-name set",
+            value=len(self.name_index),
+        )
+
+        if netlify is None:
+            return
+        yield GaugeMetricFamily(
+            "netlify_zone_records",
+            "DNS records held in the local zone mirror",
+            value=len(netlify.record_index),
+        )
+        stats = netlify.stats()
+        for key, help_text in (
+            ("requests", "Netlify API attempts sent"),
+            ("retries", "Netlify API attempts that were retries"),
+            ("rate_limited", "Netlify API responses that were 429s"),
+            ("throttled", "Netlify API calls delayed by the client-side throttle"),
+        ):
+            yield CounterMetricFamily(f"netlify_{key}", help_text, value=stats[key])
+        yield CounterMetricFamily(
+            "netlify_throttle_wait_seconds",
+            "Time Netlify API calls spent waiting on the client-side throttle",
+            value=stats["throttle_wait_s_total"],
+        )
+
+        breaker = stats["breaker"]
+        state = GaugeMetricFamily(
+            "netlify_breaker_state",
+            "1 for the circuit breaker's current state",
+            labels=["state"],
+        )
+        for name in (
+            netlify.breaker.CLOSED,
+            netlify.breaker.OPEN,
+            netlify.breaker.HALF_OPEN,
+        ):
+            state.add_metric([name], 1 if breaker["state"] == name else 0)
+        yield state
+        yield GaugeMetricFamily(
+            "netlify_breaker_consecutive_failures",
+            "Failed Netlify calls since the last success",
+            value=breaker["consecutive_failures"],
+        )
+        yield CounterMetricFamily(
+            "netlify_breaker_opened",
+            "Times the breaker opened",
+            value=breaker["times_opened"],
+        )
+        yield CounterMetricFamily(
+            "netlify_breaker_rejected",
+            "Calls failed fast while the breaker was open",
+            value=breaker["rejected"],
+        )
+
+
+# Collector added by register_app_stats, replaced when an app is set up again
+_app_stats: Optional[AppStatsCollector] = None
+
+
+def register_app_stats(collector: AppStatsCollector) -> None:
+    """
+    Register the app stats collector with the default registry. Registering
+    another one (an app configured twice in one process) replaces it rather
+    than failing on duplicated timeseries.
+    """
+    global _app_stats
+    if _app_stats is not None:
+        REGISTRY.unregister(_app_stats)
+    REGISTRY.register(collector)
+    _app_stats = collector
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
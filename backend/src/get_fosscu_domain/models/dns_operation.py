@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from sqlalchemy import (Column, DateTime, ForeignKey, Index, Integer, String,
+                        Text)
+
+from ..postgres import Base
+
+
+class DnsOperation(Base):
+    """A DNS change recorded with its subdomain row, applied to Netlify later"""
+
+    __tablename__ = "dns_outbox"
+
+    PENDING = "pending"
+    # Leased by a worker, next_attempt_at is when the lease runs out
+    IN_FLIGHT = "in_flight"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    CREATE = "create"
+
+    id = Column(Integer, primary_key=True)
+    action = Column(String, nullable=False)
+    status = Column(String, nullable=False, default=PENDING)
+    subdomain_id = Column(
+        Integer, ForeignKey("subdomains.id", ondelete="SET NULL"), nullable=True
+    )
+    user_id = Column(Text, ForeignKey("users.id"))
+    hostname = Column(String, nullable=False)
+    record_type = Column(String, nullable=False)
+    value = Column(String, nullable=False)
+    ttl = Column(Integer, nullable=False)
+    priority = Column(Integer, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_dns_outbox_status_next_attempt_at", status, next_attempt_at),
+    )
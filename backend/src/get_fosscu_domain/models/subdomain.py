@@ -1,6 +1,7 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import (Column, DateTime, ForeignKey, Index, Integer, String,
+                        Text, func)
 
 from ..postgres import Base
 
@@ -17,3 +18,10 @@ class Subdomain(Base):
     user_id = Column(Text, ForeignKey("users.id"))
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # Listings page through one user's rows in creation order
+        Index("ix_subdomains_user_id_created_at", user_id, created_at),
+        # Names are DNS labels, so "Demo" and "demo" are the same subdomain
+        Index("ix_subdomains_lower_subdomain", func.lower(subdomain), unique=True),
+    )
@@ -1,13 +1,84 @@
+import time
+from typing import Any, Dict
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from .config import Config, get_settings
+
+# Async drivers used by the request path for each sync dialect
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def get_async_url(url: str) -> URL:
+    """Map the configured (sync) database URL onto its asyncio driver"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    return url.set(drivername=ASYNC_DRIVERS.get(backend, url.drivername))
+
+
+def get_pool_options(settings: Config) -> Dict[str, Any]:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+class PoolMetrics:
+    """Running totals of how long requests waited to check out a connection"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def observe_checkout(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_time_total += seconds
+        self.wait_time_max = max(self.wait_time_max, seconds)
+
 
-from .config import get_settings
+pool_metrics = PoolMetrics()
 
-engine = create_engine(get_settings().POSTGRES_DB_URL, connect_args={}, future=True)
+
+class MeteredAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records checkout wait time, including pre-ping"""
+
+    def connect(self):
+        start_time = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            pool_metrics.observe_checkout(time.perf_counter() - start_time)
+
+
+# The sync engine is kept for Alembic and one-off scripts
+engine = create_engine(
+    get_settings().POSTGRES_DB_URL,
+    connect_args={},
+    future=True,
+    **get_pool_options(get_settings()),
+)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(
+    get_async_url(get_settings().POSTGRES_DB_URL),
+    poolclass=MeteredAsyncQueuePool,
+    **get_pool_options(get_settings()),
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
 
@@ -17,3 +88,25 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_pool_stats() -> Dict[str, float]:
+    """Snapshot of the request-path connection pool for health and metrics"""
+    pool = async_engine.pool
+    stats = {
+        "checkouts": pool_metrics.checkouts,
+        "checkout_wait_ms_total": round(pool_metrics.wait_time_total * 1000, 2),
+        "checkout_wait_ms_max": round(pool_metrics.wait_time_max * 1000, 2),
+    }
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+        )
+    return stats
@@ -1,16 +1,89 @@
 from typing import Any, Awaitable, Callable, List, Optional, Union
 
 from fastapi import Request, Response
+from jose import JWTError
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
+from slowapi.wrappers import LimitGroup
 
-limiter = Limiter(key_func=get_remote_address)
+from .auth.auth import decode_access_token
+from .config import get_settings
+
+
+def get_rate_limit_key(request: Request) -> str:
+    """
+    Key requests on the authenticated user so that users sharing a NAT'd
+    address get their own budget; anonymous or invalid tokens fall back to
+    the client IP.
+    """
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            github_id = decode_access_token(token).get("sub")
+        except JWTError:
+            github_id = None
+        if github_id is not None:
+            return f"user:{github_id}"
+    return f"ip:{get_remote_address(request)}"
+
+
+# Counters live in a shared store (redis://, memcached://) when configured so
+# that every worker and replica enforces one limit; memory:// keeps them per
+# process. If the shared store goes away requests fall back to memory.
+KEY_PREFIX = "get_fosscu_domain"
+limiter = Limiter(
+    key_func=get_rate_limit_key,
+    storage_uri=get_settings().RATE_LIMIT_STORAGE_URI,
+    strategy=get_settings().RATE_LIMIT_STRATEGY,
+    in_memory_fallback_enabled=True,
+    key_prefix=KEY_PREFIX,
+    headers_enabled=True,
+)
+
+# Requests that write DNS records draw from one shared per-user budget, each
+# route charging roughly the number of Netlify mutations it makes
+DNS_COST_CREATE = 1
+DNS_COST_UPDATE = 2
+DNS_COST_DELETE = 1
+
+
+def dns_limit(cost: int):
+    return limiter.shared_limit(get_settings().RATE_LIMIT_DNS, scope="dns", cost=cost)
+
+
+def charge_dns(request: Request, cost: int) -> None:
+    """
+    Charge the shared DNS budget from inside a route, for work that is only
+    sized once the body is parsed (the items of a batch). Raises
+    RateLimitExceeded when the budget cannot cover it.
+    """
+    if not limiter.enabled or cost <= 0:
+        return
+    (limit,) = LimitGroup(
+        get_settings().RATE_LIMIT_DNS,
+        get_rate_limit_key,
+        "dns",
+        False,
+        None,
+        None,
+        None,
+        cost,
+        False,
+    )
+    args = [KEY_PREFIX, get_rate_limit_key(request), "dns"]
+    request.state.view_rate_limit = (limit.limit, args)
+    if not limiter.limiter.hit(limit.limit, *args, cost=cost):
+        raise RateLimitExceeded(limit)
 
 
 def rate_limit_exceeded_handler(
     request: Request, exc: Exception
 ) -> Union[Response, Awaitable[Response]]:
     if isinstance(exc, RateLimitExceeded):
-        return Response(content="Rate limit exceeded", status_code=429)
+        response = Response(content="Rate limit exceeded", status_code=429)
+        # Tell the client when the window frees up so it can back off
+        return request.app.state.limiter._inject_headers(
+            response, request.state.view_rate_limit
+        )
     return Response(content="An error occurred", status_code=500)
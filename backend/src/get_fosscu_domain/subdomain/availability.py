@@ -0,0 +1,63 @@
+import asyncio
+import logging
+from typing import Iterable, Set
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from ..models.subdomain import Subdomain
+
+logger = logging.getLogger(__name__)
+
+
+class SubdomainNameIndex:
+    def __init__(self):
+        """
+        In-memory set of subdomain names already taken in the database.
+        Loaded once at startup, kept current by this worker's own writes and
+        reloaded periodically to pick up writes made by other workers.
+        """
+        self._names: Set[str] = set()
+        self.loaded = False
+
+    async def load(self, session_factory: async_sessionmaker) -> None:
+        async with session_factory() as db:
+            names = (await db.scalars(select(Subdomain.subdomain))).all()
+        self._names = {name.lower() for name in names if name}
+        self.loaded = True
+
+    def add(self, *names: str) -> None:
+        self._names.update(name.lower() for name in names)
+
+    def discard(self, *names: str) -> None:
+        self._names.difference_update(name.lower() for name in names)
+
+    def __contains__(self, name: str) -> bool:
+        return name.lower() in self._names
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+name_index = SubdomainNameIndex()
+
+
+def taken_names_query(names: Iterable[str]) -> Select:
+    """
+    Select which of `names` are already claimed, compared case-insensitively
+    so the lookup is served by ix_subdomains_lower_subdomain
+    """
+    name = func.lower(Subdomain.subdomain)
+    return select(name).where(name.in_([n.lower() for n in names]))
+
+
+async def reload_name_index(
+    index: SubdomainNameIndex, session_factory: async_sessionmaker, interval: float
+) -> None:
+    """Periodically reload the taken-name set from the database"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await index.load(session_factory)
+        except Exception as e:
+            logger.error(f"Error reloading subdomain names: {str(e)}")
@@ -1,48 +1,142 @@
+import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from fastapi import (APIRouter, Depends, HTTPException, Query, Request,
+                     Response, status)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import (DateTime, Integer, String, Text, delete, func, insert,
+                        literal, select)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..auth.auth import get_current_user
+from ..auth.auth import get_admin_user, get_current_user
 from ..config import get_settings
+from ..models.dns_operation import DnsOperation
 from ..models.subdomain import Subdomain
 from ..models.user import User
-from ..postgres import get_db
-from ..subdomain.schema import SubdomainCreate, SubdomainResponse
-from ..utils.netlify import Netlify
+from ..postgres import AsyncSessionLocal, get_async_db
+from ..rate_limiting import (DNS_COST_CREATE, DNS_COST_DELETE, DNS_COST_UPDATE,
+                             charge_dns, dns_limit)
+from ..subdomain.availability import name_index, taken_names_query
+from ..subdomain.listing import (ADMIN_LISTABLE_FIELDS, DEFAULT_PAGE_SIZE,
+                                 MAX_PAGE_SIZE, ListingError, fetch_page,
+                                 keyset_query, parse_fields, stream_ndjson)
+from ..subdomain.outbox import (OutboxWorker, cancel_pending, create_operation,
+                                requeue)
+from ..subdomain.schema import (DnsOperationResponse, SubdomainAvailability,
+                                SubdomainBatchCreate, SubdomainBatchDelete,
+                                SubdomainBatchItemResult,
+                                SubdomainBatchResponse, SubdomainCreate,
+                                SubdomainFields, SubdomainResponse,
+                                validate_subdomain_name)
+from ..utils.netlify import AsyncNetlify
 from ..utils.profanity_filter import is_profanity_found
 
 router = APIRouter(tags=["subdomains"])
 
-
-def get_netlify_client():
-    settings = get_settings()
-    return Netlify(access_token=settings.NETLIFY_ACCESS_KEY)
+MAX_SUBDOMAINS_PER_USER = 5
+
+DNS_IN_FLIGHT = "DNS record is still being provisioned, try again shortly"
+
+
+def get_netlify_client(request: Request) -> AsyncNetlify:
+    return request.app.state.netlify
+
+
+def get_outbox_worker(request: Request) -> Optional[OutboxWorker]:
+    return getattr(request.app.state, "outbox_worker", None)
+
+
+def get_writable_netlify_client(
+    netlify: AsyncNetlify = Depends(get_netlify_client),
+) -> AsyncNetlify:
+    """Fail a DNS-mutating request up front while Netlify is known to be down"""
+    netlify.breaker.check()
+    return netlify
+
+
+@asynccontextmanager
+async def _taken_over_from_outbox(
+    db: AsyncSession, subdomain: Subdomain
+) -> AsyncIterator[None]:
+    """
+    Cancel the queued DNS operation of a subdomain for the inline Netlify
+    change made in the block, and queue it again if that change fails
+    """
+    cancelled, in_flight = await cancel_pending(db, [subdomain.id])
+    if subdomain.id in in_flight:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=DNS_IN_FLIGHT)
+    try:
+        yield
+    except Exception:
+        await requeue(db, cancelled.get(subdomain.id, []))
+        raise
+
+
+async def _lock_quota(db: AsyncSession, user: User) -> None:
+    """
+    Lock the user's row until the transaction ends. The quota subquery of a
+    claim reads a snapshot under READ COMMITTED, so two concurrent claims
+    could both see the user under the limit; claims serialize on this lock
+    instead. SQLite has no row locks and serializes writers anyway.
+    """
+    await db.execute(select(User.id).where(User.id == user.id).with_for_update())
+
+
+def _claim_statement(subdomain_data: SubdomainCreate, user: User, now: datetime):
+    """INSERT ... SELECT of a new subdomain that only inserts under the quota"""
+    return (
+        insert(Subdomain)
+        .from_select(
+            [
+                Subdomain.subdomain,
+                Subdomain.target_domain,
+                Subdomain.record_type,
+                Subdomain.ttl,
+                Subdomain.priority,
+                Subdomain.user_id,
+                Subdomain.created_at,
+                Subdomain.updated_at,
+            ],
+            select(
+                literal(subdomain_data.subdomain, String),
+                literal(subdomain_data.target_domain, String),
+                literal(subdomain_data.record_type, String),
+                literal(subdomain_data.ttl, Integer),
+                literal(subdomain_data.priority, Integer),
+                literal(user.id, Text),
+                literal(now, DateTime),
+                literal(now, DateTime),
+            ).where(
+                select(func.count(Subdomain.id))
+                .where(Subdomain.user_id == user.id)
+                .scalar_subquery()
+                < MAX_SUBDOMAINS_PER_USER
+            ),
+        )
+        .returning(Subdomain)
+    )
 
 
-@router.post("/", response_model=SubdomainResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/", response_model=DnsOperationResponse, status_code=status.HTTP_202_ACCEPTED
+)
+@dns_limit(cost=DNS_COST_CREATE)
 async def create_subdomain(
+    request: Request,
+    response: Response,
     subdomain_data: SubdomainCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
-    netlify: Netlify = Depends(get_netlify_client),
+    netlify: AsyncNetlify = Depends(get_netlify_client),
+    outbox_worker: Optional[OutboxWorker] = Depends(get_outbox_worker),
 ):
-    """Create a new subdomain for the authenticated user"""
-
-    # Check if user has reached the maximum limit of 5 domains
-    domain_count = (
-        db.query(func.count(Subdomain.id))
-        .filter(Subdomain.user_id == current_user.id)
-        .scalar()
-    )
-
-    if domain_count >= 5:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Maximum limit of 5 domains reached",
-        )
+    """
+    Claim a new subdomain for the authenticated user. Its DNS record is
+    created in the background; poll the returned operation for the outcome.
+    """
 
     # Check for profanity in subdomain
     if is_profanity_found(subdomain_data.subdomain):
@@ -51,83 +145,393 @@ async def create_subdomain(
             detail="Subdomain contains inappropriate content",
         )
 
-    # Check if subdomain already exists in database
-    existing_subdomain = (
-        db.query(Subdomain)
-        .filter(Subdomain.subdomain == subdomain_data.subdomain)
-        .first()
-    )
+    # Records created outside the app, checked against the local DNS mirror
+    base_domain = get_settings().NETLIFY_DOMAIN
+    hostname = f"{subdomain_data.subdomain}.{base_domain}"
+    zone_id = netlify.zone_cache.peek(base_domain)
+    if zone_id and netlify.record_index.get(zone_id, hostname):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Subdomain already exists in Netlify DNS",
+        )
 
-    if existing_subdomain:
+    # Claim the name in one statement: the insert only happens while the user
+    # is under the limit, and the unique constraint rejects taken names
+    claim = _claim_statement(subdomain_data, current_user, datetime.utcnow())
+    # The DNS operation is recorded in the same transaction as the row, so a
+    # claimed name always has its record provisioned eventually
+    try:
+        await _lock_quota(db, current_user)
+        new_subdomain = await db.scalar(claim)
+        if new_subdomain is not None:
+            operation = create_operation(new_subdomain, base_domain)
+            db.add(operation)
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Subdomain already exists in database",
         )
 
-    # Get Netlify zone ID
-    base_domain = get_settings().NETLIFY_DOMAIN
-    zone_id = netlify.get_zone_id_by_domain(base_domain)
-    if not zone_id:
+    if new_subdomain is None:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to get DNS zone ID",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Maximum limit of {MAX_SUBDOMAINS_PER_USER} domains reached",
         )
+    name_index.add(new_subdomain.subdomain)
 
-    # Check if record exists in Netlify
-    record_id = netlify.get_record_id_by_subdomain(
-        zone_id, f"{subdomain_data.subdomain}.{base_domain}"
+    if outbox_worker is not None:
+        outbox_worker.notify()
+    response.headers["Location"] = str(
+        request.url_for("get_dns_operation", operation_id=operation.id)
     )
+    return operation
 
-    if record_id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Subdomain already exists in Netlify DNS",
-        )
 
-    # Create DNS record on Netlify
-    dns_record = netlify.create_dns_record(
-        zone_id=zone_id,
-        record_type=subdomain_data.record_type,
-        hostname=f"{subdomain_data.subdomain}.{base_domain}",
-        value=subdomain_data.target_domain,
-        ttl=subdomain_data.ttl,
-        priority=(
-            subdomain_data.priority if subdomain_data.record_type == "MX" else None
-        ),
+def _batch_response(results: List[SubdomainBatchItemResult]) -> SubdomainBatchResponse:
+    succeeded = sum(1 for result in results if result.success)
+    return SubdomainBatchResponse(
+        succeeded=succeeded, failed=len(results) - succeeded, results=results
     )
 
-    if not dns_record:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to create DNS record on Netlify",
+
+@router.post(
+    "/batch",
+    response_model=SubdomainBatchResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+@dns_limit(cost=DNS_COST_CREATE)
+async def create_subdomains_batch(
+    request: Request,
+    response: Response,
+    batch: SubdomainBatchCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+    netlify: AsyncNetlify = Depends(get_netlify_client),
+    outbox_worker: Optional[OutboxWorker] = Depends(get_outbox_worker),
+):
+    """
+    Claim several subdomains at once, reporting the outcome of each. As with
+    a single create, their DNS records are created in the background.
+    """
+
+    base_domain = get_settings().NETLIFY_DOMAIN
+    items = batch.subdomains
+    # The decorator charged for one create; the rest are charged now that the
+    # batch size is known
+    charge_dns(request, (len(items) - 1) * DNS_COST_CREATE)
+    results = [
+        SubdomainBatchItemResult(subdomain=item.subdomain, success=False)
+        for item in items
+    ]
+
+    def fail(index: int, detail: str) -> None:
+        results[index].detail = detail
+
+    # Validate the whole batch before touching the database
+    pending: List[int] = []
+    seen = set()
+    for index, item in enumerate(items):
+        if item.subdomain in seen:
+            fail(index, "Duplicate subdomain in batch")
+        elif is_profanity_found(item.subdomain):
+            fail(index, "Subdomain contains inappropriate content")
+        else:
+            seen.add(item.subdomain)
+            pending.append(index)
+
+    # One query for every name in the batch that is already taken
+    if pending:
+        taken = set((await db.scalars(taken_names_query(seen))).all())
+        for index in [i for i in pending if items[i].subdomain in taken]:
+            fail(index, "Subdomain already exists in database")
+            pending.remove(index)
+
+    # Records created outside the app, checked against the local DNS mirror
+    zone_id = netlify.zone_cache.peek(base_domain)
+    if zone_id:
+        for index in list(pending):
+            hostname = f"{items[index].subdomain}.{base_domain}"
+            if netlify.record_index.get(zone_id, hostname):
+                fail(index, "Subdomain already exists in Netlify DNS")
+                pending.remove(index)
+
+    # Claim each name with the quota-guarded insert of a single create and
+    # record its DNS operation with it. Every claim has its own savepoint, so
+    # a name taken in the meantime only fails its item, and all of them
+    # commit together.
+    now = datetime.utcnow()
+    claims: Dict[int, Tuple[Subdomain, DnsOperation]] = {}
+    if pending:
+        await _lock_quota(db, current_user)
+    for index in pending:
+        try:
+            async with db.begin_nested():
+                row = await db.scalar(_claim_statement(items[index], current_user, now))
+                if row is not None:
+                    operation = create_operation(row, base_domain)
+                    db.add(operation)
+        except IntegrityError:
+            fail(index, "Subdomain already exists in database")
+            continue
+        if row is None:
+            fail(index, f"Maximum limit of {MAX_SUBDOMAINS_PER_USER} domains reached")
+            continue
+        claims[index] = (row, operation)
+    await db.commit()
+
+    name_index.add(*(row.subdomain for row, _ in claims.values()))
+    if claims and outbox_worker is not None:
+        outbox_worker.notify()
+
+    for index, (row, operation) in claims.items():
+        results[index].success = True
+        results[index].id = row.id
+        results[index].operation_id = operation.id
+        results[index].data = SubdomainResponse.model_validate(
+            row, from_attributes=True
         )
 
-    # Create new subdomain in database
-    new_subdomain = Subdomain(
-        subdomain=subdomain_data.subdomain,
-        target_domain=subdomain_data.target_domain,
-        record_type=subdomain_data.record_type,
-        ttl=subdomain_data.ttl,
-        priority=subdomain_data.priority,
-        user_id=current_user.id,
+    return _batch_response(results)
+
+
+@router.post(
+    "/batch/delete",
+    response_model=SubdomainBatchResponse,
+    status_code=status.HTTP_200_OK,
+)
+@dns_limit(cost=DNS_COST_DELETE)
+async def delete_subdomains_batch(
+    request: Request,
+    response: Response,
+    batch: SubdomainBatchDelete,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+    netlify: AsyncNetlify = Depends(get_writable_netlify_client),
+):
+    """Delete several subdomains at once, reporting the outcome of each"""
+
+    settings = get_settings()
+    base_domain = settings.BASE_DOMAIN
+    ids = list(dict.fromkeys(batch.ids))
+    # The decorator charged for one delete; the rest are charged now that the
+    # batch size is known
+    charge_dns(request, (len(ids) - 1) * DNS_COST_DELETE)
+
+    rows = {
+        row.id: row
+        for row in await db.scalars(
+            select(Subdomain).where(
+                Subdomain.id.in_(ids), Subdomain.user_id == current_user.id
+            )
+        )
+    }
+    cancelled, in_flight = await cancel_pending(db, rows) if rows else ({}, set())
+    try:
+        zone_id = await netlify.get_zone_id_by_domain(base_domain) if rows else None
+    except Exception:
+        await requeue(db, [i for ids in cancelled.values() for i in ids])
+        raise
+    semaphore = asyncio.Semaphore(settings.NETLIFY_BATCH_CONCURRENCY)
+
+    async def deprovision(row: Subdomain) -> Optional[str]:
+        if row.id in in_flight:
+            return DNS_IN_FLIGHT
+        if not zone_id:
+            return None
+        async with semaphore:
+            try:
+                record_id = await netlify.get_record_id_by_subdomain(
+                    zone_id, f"{row.subdomain}.{base_domain}", row.record_type
+                )
+                if record_id and not await netlify.remove_dns_record(
+                    zone_id, record_id
+                ):
+                    return "Failed to remove DNS record on Netlify"
+            except Exception as e:
+                return f"Failed to remove DNS record on Netlify: {str(e)}"
+            return None
+
+    errors = dict(
+        zip(rows, await asyncio.gather(*(deprovision(r) for r in rows.values())))
     )
 
-    db.add(new_subdomain)
-    db.commit()
-    db.refresh(new_subdomain)
+    results = []
+    removed = []
+    for subdomain_id in ids:
+        row = rows.get(subdomain_id)
+        if row is None:
+            results.append(
+                SubdomainBatchItemResult(
+                    id=subdomain_id, success=False, detail="Subdomain not found"
+                )
+            )
+            continue
+        error = errors[subdomain_id]
+        results.append(
+            SubdomainBatchItemResult(
+                id=subdomain_id,
+                subdomain=row.subdomain,
+                success=error is None,
+                detail=error,
+            )
+        )
+        if error is None:
+            removed.append(subdomain_id)
+            name_index.discard(row.subdomain)
+
+    # Rows that stay still need the records their cancelled operations create
+    await requeue(
+        db,
+        [
+            operation_id
+            for subdomain_id, operation_ids in cancelled.items()
+            if subdomain_id not in removed
+            for operation_id in operation_ids
+        ],
+    )
+    if removed:
+        await db.execute(delete(Subdomain).where(Subdomain.id.in_(removed)))
+        await db.commit()
 
-    return new_subdomain
+    return _batch_response(results)
 
 
-@router.get("/", response_model=List[SubdomainResponse], status_code=status.HTTP_200_OK)
+@router.get(
+    "/",
+    response_model=List[SubdomainFields],
+    response_model_exclude_unset=True,
+    status_code=status.HTTP_200_OK,
+)
 async def get_user_subdomains(
-    db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = Query(None, description="X-Next-Cursor of the last page"),
+    fields: Optional[str] = Query(None, description="Comma-separated field names"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
 ):
-    """Get all subdomains for the authenticated user"""
+    """
+    Get the authenticated user's subdomains, oldest first. When there are
+    more, the cursor of the next page is returned in the X-Next-Cursor header.
+    """
+
+    try:
+        selected = parse_fields(fields)
+        query = keyset_query(selected, after)
+    except ListingError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    rows, next_cursor = await fetch_page(
+        db, query.where(Subdomain.user_id == current_user.id), selected, limit
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    return rows
+
+
+@router.get(
+    "/all",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def export_subdomains(
+    after: Optional[str] = Query(None, description="Resume after this cursor"),
+    fields: Optional[str] = Query(None, description="Comma-separated field names"),
+    admin: User = Depends(get_admin_user),
+):
+    """
+    Stream the subdomains of every user as newline-delimited JSON, oldest
+    first. Rows are sent as they are read, so the whole table is never held
+    in memory.
+    """
+
+    try:
+        selected = parse_fields(fields, ADMIN_LISTABLE_FIELDS)
+        query = keyset_query(selected, after)
+    except ListingError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return StreamingResponse(
+        stream_ndjson(AsyncSessionLocal, query, selected),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get(
+    "/available",
+    response_model=SubdomainAvailability,
+    status_code=status.HTTP_200_OK,
+    responses={503: {"description": "Name index is still loading"}},
+)
+async def check_subdomain_availability(
+    name: str, netlify: AsyncNetlify = Depends(get_netlify_client)
+) -> SubdomainAvailability:
+    """
+    Check whether a subdomain can be claimed. Answered from memory only, so
+    it is cheap enough to call on every keystroke.
+    """
+    try:
+        name = validate_subdomain_name(name)
+    except ValueError as e:
+        return SubdomainAvailability(subdomain=name, available=False, reason=str(e))
+
+    if is_profanity_found(name):
+        return SubdomainAvailability(
+            subdomain=name,
+            available=False,
+            reason="Subdomain contains inappropriate content",
+        )
 
-    subdomains = db.query(Subdomain).filter(Subdomain.user_id == current_user.id).all()
+    if not name_index.loaded:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Subdomain availability is not ready yet",
+        )
+
+    if name in name_index:
+        return SubdomainAvailability(
+            subdomain=name, available=False, reason="Subdomain is already taken"
+        )
+
+    # Records created outside the app, served from the local DNS mirror
+    base_domain = get_settings().NETLIFY_DOMAIN
+    zone_id = netlify.zone_cache.peek(base_domain)
+    if zone_id and netlify.record_index.get(zone_id, f"{name}.{base_domain}"):
+        return SubdomainAvailability(
+            subdomain=name, available=False, reason="Subdomain is already taken"
+        )
 
-    return subdomains
+    return SubdomainAvailability(subdomain=name, available=True)
+
+
+@router.get(
+    "/operations/{operation_id}",
+    response_model=DnsOperationResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_dns_operation(
+    operation_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Get the provisioning status of a DNS operation"""
+
+    operation = await db.scalar(
+        select(DnsOperation).where(
+            DnsOperation.id == operation_id, DnsOperation.user_id == current_user.id
+        )
+    )
+
+    if not operation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Operation not found"
+        )
+
+    return operation
 
 
 @router.get(
@@ -135,15 +539,15 @@ async def get_user_subdomains(
 )
 async def get_subdomain(
     subdomain_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get a specific subdomain by ID"""
 
-    subdomain = (
-        db.query(Subdomain)
-        .filter(Subdomain.id == subdomain_id, Subdomain.user_id == current_user.id)
-        .first()
+    subdomain = await db.scalar(
+        select(Subdomain).where(
+            Subdomain.id == subdomain_id, Subdomain.user_id == current_user.id
+        )
     )
 
     if not subdomain:
@@ -157,12 +561,15 @@ async def get_subdomain(
 @router.put(
     "/{subdomain_id}", response_model=SubdomainResponse, status_code=status.HTTP_200_OK
 )
+@dns_limit(cost=DNS_COST_UPDATE)
 async def update_subdomain(
+    request: Request,
+    response: Response,
     subdomain_id: int,
     subdomain_data: SubdomainCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
-    netlify: Netlify = Depends(get_netlify_client),
+    netlify: AsyncNetlify = Depends(get_writable_netlify_client),
 ):
     """Update a specific subdomain"""
 
@@ -173,10 +580,10 @@ async def update_subdomain(
             detail="Subdomain contains inappropriate content",
         )
 
-    subdomain = (
-        db.query(Subdomain)
-        .filter(Subdomain.id == subdomain_id, Subdomain.user_id == current_user.id)
-        .first()
+    subdomain = await db.scalar(
+        select(Subdomain).where(
+            Subdomain.id == subdomain_id, Subdomain.user_id == current_user.id
+        )
     )
 
     if not subdomain:
@@ -185,7 +592,7 @@ async def update_subdomain(
         )
 
     base_domain = get_settings().BASE_DOMAIN
-    zone_id = netlify.get_zone_id_by_domain(base_domain)
+    zone_id = await netlify.get_zone_id_by_domain(base_domain)
     if not zone_id:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -195,13 +602,10 @@ async def update_subdomain(
     # If subdomain name is being changed
     if subdomain_data.subdomain != subdomain.subdomain:
         # Check if new subdomain name already exists in database
-        existing_subdomain = (
-            db.query(Subdomain)
-            .filter(
-                Subdomain.subdomain == subdomain_data.subdomain,
-                Subdomain.id != subdomain_id,
+        existing_subdomain = await db.scalar(
+            taken_names_query([subdomain_data.subdomain]).where(
+                Subdomain.id != subdomain_id
             )
-            .first()
         )
 
         if existing_subdomain:
@@ -211,7 +615,7 @@ async def update_subdomain(
             )
 
         # Check if new subdomain exists in Netlify
-        new_record_id = netlify.get_record_id_by_subdomain(
+        new_record_id = await netlify.get_record_id_by_subdomain(
             zone_id, f"{subdomain_data.subdomain}.{base_domain}"
         )
 
@@ -221,51 +625,59 @@ async def update_subdomain(
                 detail="Subdomain already exists in Netlify DNS",
             )
 
-        # Delete old DNS record
-        old_record_id = netlify.get_record_id_by_subdomain(
-            zone_id, f"{subdomain.subdomain}.{base_domain}"
-        )
-        if old_record_id:
-            netlify.remove_dns_record(zone_id, old_record_id)
-
-    # Create or update DNS record
-    record_id = netlify.get_record_id_by_subdomain(
-        zone_id, f"{subdomain.subdomain}.{base_domain}"
-    )
+    # The record is written inline, a queued create would race with it
+    async with _taken_over_from_outbox(db, subdomain):
+        if subdomain_data.subdomain != subdomain.subdomain:
+            # Delete old DNS record
+            old_record_id = await netlify.get_record_id_by_subdomain(
+                zone_id, f"{subdomain.subdomain}.{base_domain}", subdomain.record_type
+            )
+            if old_record_id:
+                await netlify.remove_dns_record(zone_id, old_record_id)
 
-    if record_id:
-        # Update existing record
-        netlify.update_dns_record(
-            zone_id=zone_id,
-            record_id=record_id,
-            record_type=subdomain_data.record_type,
-            hostname=f"{subdomain_data.subdomain}.{base_domain}",
-            value=subdomain_data.target_domain,
-            ttl=subdomain_data.ttl,
-            priority=(
-                subdomain_data.priority if subdomain_data.record_type == "MX" else None
-            ),
-        )
-    else:
-        # Create new record
-        dns_record = netlify.create_dns_record(
-            zone_id=zone_id,
-            record_type=subdomain_data.record_type,
-            hostname=f"{subdomain_data.subdomain}.{base_domain}",
-            value=subdomain_data.target_domain,
-            ttl=subdomain_data.ttl,
-            priority=(
-                subdomain_data.priority if subdomain_data.record_type == "MX" else None
-            ),
+        # Create or update DNS record
+        record_id = await netlify.get_record_id_by_subdomain(
+            zone_id, f"{subdomain.subdomain}.{base_domain}", subdomain.record_type
         )
 
-        if not dns_record:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to create DNS record on Netlify",
+        if record_id:
+            # Update existing record
+            await netlify.update_dns_record(
+                zone_id=zone_id,
+                record_id=record_id,
+                record_type=subdomain_data.record_type,
+                hostname=f"{subdomain_data.subdomain}.{base_domain}",
+                value=subdomain_data.target_domain,
+                ttl=subdomain_data.ttl,
+                priority=(
+                    subdomain_data.priority
+                    if subdomain_data.record_type == "MX"
+                    else None
+                ),
+            )
+        else:
+            # Create new record
+            dns_record = await netlify.create_dns_record(
+                zone_id=zone_id,
+                record_type=subdomain_data.record_type,
+                hostname=f"{subdomain_data.subdomain}.{base_domain}",
+                value=subdomain_data.target_domain,
+                ttl=subdomain_data.ttl,
+                priority=(
+                    subdomain_data.priority
+                    if subdomain_data.record_type == "MX"
+                    else None
+                ),
             )
 
+            if not dns_record:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Failed to create DNS record on Netlify",
+                )
+
     # Update database record
+    old_name = subdomain.subdomain
     subdomain.subdomain = subdomain_data.subdomain
     subdomain.target_domain = subdomain_data.target_domain
     subdomain.record_type = subdomain_data.record_type
@@ -273,25 +685,30 @@ async def update_subdomain(
     subdomain.priority = subdomain_data.priority
     subdomain.updated_at = datetime.utcnow()
 
-    db.commit()
-    db.refresh(subdomain)
+    await db.commit()
+    await db.refresh(subdomain)
+    name_index.discard(old_name)
+    name_index.add(subdomain.subdomain)
 
     return subdomain
 
 
 @router.delete("/{subdomain_id}", status_code=status.HTTP_204_NO_CONTENT)
+@dns_limit(cost=DNS_COST_DELETE)
 async def delete_subdomain(
+    request: Request,
+    response: Response,
     subdomain_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
-    netlify: Netlify = Depends(get_netlify_client),
+    netlify: AsyncNetlify = Depends(get_writable_netlify_client),
 ):
     """Delete a specific subdomain"""
 
-    subdomain_instance = (
-        db.query(Subdomain)
-        .filter(Subdomain.id == subdomain_id, Subdomain.user_id == current_user.id)
-        .first()
+    subdomain_instance = await db.scalar(
+        select(Subdomain).where(
+            Subdomain.id == subdomain_id, Subdomain.user_id == current_user.id
+        )
     )
 
     if not subdomain_instance:
@@ -301,16 +718,20 @@ async def delete_subdomain(
 
     # Delete DNS record from Netlify
     base_domain = get_settings().BASE_DOMAIN
-    zone_id = netlify.get_zone_id_by_domain(base_domain)
-    if zone_id:
-        record_id = netlify.get_record_id_by_subdomain(
-            zone_id, f"{subdomain_instance.subdomain}.{base_domain}"
-        )
-        if record_id:
-            netlify.remove_dns_record(zone_id, record_id)
+    async with _taken_over_from_outbox(db, subdomain_instance):
+        zone_id = await netlify.get_zone_id_by_domain(base_domain)
+        if zone_id:
+            record_id = await netlify.get_record_id_by_subdomain(
+                zone_id,
+                f"{subdomain_instance.subdomain}.{base_domain}",
+                subdomain_instance.record_type,
+            )
+            if record_id:
+                await netlify.remove_dns_record(zone_id, record_id)
 
     # Delete from database
-    db.delete(subdomain_instance)
-    db.commit()
+    await db.delete(subdomain_instance)
+    await db.commit()
+    name_index.discard(subdomain_instance.subdomain)
 
     return None
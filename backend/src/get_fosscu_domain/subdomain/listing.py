@@ -0,0 +1,129 @@
+"""
+Keyset pagination and column selection for subdomain listings.
+
+Pages are ordered by (created_at, id) and continue after the last row of the
+previous page, so a page costs the same however deep into the table it is.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import DateTime, Integer, Select, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.subdomain import Subdomain
+
+# Columns a listing may return, in response order
+LISTABLE_FIELDS = (
+    "id",
+    "subdomain",
+    "target_domain",
+    "record_type",
+    "ttl",
+    "priority",
+    "created_at",
+    "updated_at",
+)
+# Admin listings can also tell whose subdomain it is
+ADMIN_LISTABLE_FIELDS = LISTABLE_FIELDS + ("user_id",)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class ListingError(ValueError):
+    """A cursor or field list from the query string that cannot be used"""
+
+
+def encode_cursor(created_at: datetime, subdomain_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{subdomain_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, subdomain_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(subdomain_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ListingError("Invalid cursor")
+
+
+def parse_fields(
+    fields: Optional[str], allowed: Tuple[str, ...] = LISTABLE_FIELDS
+) -> List[str]:
+    """Turn a comma-separated `fields` parameter into a list of column names"""
+    if not fields:
+        return list(allowed)
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise ListingError(f"Unknown fields: {', '.join(unknown)}")
+    if not requested:
+        raise ListingError("No fields requested")
+    return requested
+
+
+def keyset_query(fields: List[str], after: Optional[str] = None) -> Select:
+    """
+    Select `fields` (plus the keyset columns) ordered by (created_at, id),
+    starting after the row `after` points at
+    """
+    columns = dict.fromkeys(fields + ["created_at", "id"])
+    query = select(*(getattr(Subdomain, name) for name in columns)).order_by(
+        Subdomain.created_at, Subdomain.id
+    )
+    if after is not None:
+        created_at, subdomain_id = decode_cursor(after)
+        query = query.where(
+            tuple_(Subdomain.created_at, Subdomain.id)
+            > tuple_(literal(created_at, DateTime), literal(subdomain_id, Integer))
+        )
+    return query
+
+
+async def fetch_page(
+    db: AsyncSession, query: Select, fields: List[str], limit: int
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Run a keyset query for one page
+    Returns:
+        tuple: The rows as dicts of `fields`, and the cursor of the next page
+        or None on the last one
+    """
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return [{name: row._mapping[name] for name in fields} for row in rows], next_cursor
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+async def stream_ndjson(
+    session_factory, query: Select, fields: List[str], chunk_size: int = 1000
+) -> AsyncIterator[bytes]:
+    """
+    Yield the rows of `query` as newline-delimited JSON, one chunk of rows at
+    a time. The session is owned by the stream so it stays open until the
+    last row has been sent.
+    """
+    async with session_factory() as db:
+        result = await db.stream(query.execution_options(yield_per=chunk_size))
+        async for partition in result.partitions():
+            yield "".join(
+                json.dumps(
+                    {name: row._mapping[name] for name in fields},
+                    default=_json_default,
+                )
+                + "\n"
+                for row in partition
+            ).encode()
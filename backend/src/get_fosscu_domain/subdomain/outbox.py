@@ -0,0 +1,322 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+import httpx
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..config import Config
+from ..models.dns_operation import DnsOperation
+from ..models.subdomain import Subdomain
+from ..subdomain.availability import name_index
+from ..utils.netlify import AsyncNetlify, CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+
+class OperationRejected(Exception):
+    """Netlify refused the change; retrying the same operation cannot help"""
+
+
+def create_operation(subdomain: Subdomain, base_domain: str) -> DnsOperation:
+    """Build the outbox entry that provisions the DNS record of a new subdomain"""
+    return DnsOperation(
+        action=DnsOperation.CREATE,
+        status=DnsOperation.PENDING,
+        subdomain_id=subdomain.id,
+        user_id=subdomain.user_id,
+        hostname=f"{subdomain.subdomain}.{base_domain}",
+        record_type=subdomain.record_type,
+        value=subdomain.target_domain,
+        ttl=subdomain.ttl,
+        priority=subdomain.priority if subdomain.record_type == "MX" else None,
+        attempts=0,
+        next_attempt_at=datetime.utcnow(),
+    )
+
+
+async def cancel_pending(
+    db: AsyncSession, subdomain_ids: Iterable[int]
+) -> Tuple[Dict[int, List[int]], Set[int]]:
+    """
+    Cancel the queued operations of subdomains about to be changed or removed
+    inline, and commit so no worker can lease them afterwards. Call it before
+    writing to Netlify, and hand the cancelled operations to `requeue` if
+    that write fails.
+    Returns:
+        Dict[int, List[int]]: Cancelled operation IDs by subdomain
+        Set[int]: Subdomains whose operation a worker is applying right now,
+        the caller must leave their DNS records alone
+    """
+    subdomain_ids = list(subdomain_ids)
+    cancelled: Dict[int, List[int]] = {}
+    rows = await db.execute(
+        update(DnsOperation)
+        .where(
+            DnsOperation.subdomain_id.in_(subdomain_ids),
+            DnsOperation.status == DnsOperation.PENDING,
+        )
+        .values(status=DnsOperation.CANCELLED, updated_at=datetime.utcnow())
+        .returning(DnsOperation.id, DnsOperation.subdomain_id)
+    )
+    for operation_id, subdomain_id in rows:
+        cancelled.setdefault(subdomain_id, []).append(operation_id)
+    in_flight = set(
+        await db.scalars(
+            select(DnsOperation.subdomain_id).where(
+                DnsOperation.subdomain_id.in_(subdomain_ids),
+                DnsOperation.status == DnsOperation.IN_FLIGHT,
+            )
+        )
+    )
+    await db.commit()
+    return cancelled, in_flight
+
+
+async def requeue(db: AsyncSession, operation_ids: Iterable[int]) -> None:
+    """
+    Put operations cancelled by `cancel_pending` back in the queue after the
+    inline change failed, so the subdomain still gets its record
+    """
+    operation_ids = list(operation_ids)
+    if not operation_ids:
+        return
+    await db.execute(
+        update(DnsOperation)
+        .where(
+            DnsOperation.id.in_(operation_ids),
+            DnsOperation.status == DnsOperation.CANCELLED,
+        )
+        .values(
+            status=DnsOperation.PENDING,
+            next_attempt_at=datetime.utcnow(),
+            updated_at=datetime.utcnow(),
+        )
+    )
+    await db.commit()
+
+
+class OutboxWorker:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        netlify: AsyncNetlify,
+        base_domain: str,
+        poll_interval: float = 5.0,
+        batch_size: int = 20,
+        max_attempts: int = 8,
+        retry_backoff: float = 2.0,
+        retry_max_delay: float = 300.0,
+        lease: float = 60.0,
+    ):
+        """
+        Applies pending DNS operations from the outbox to Netlify. Each
+        operation is leased before it is applied so several workers can share
+        one outbox, and failed attempts are rescheduled with exponential
+        backoff until `max_attempts` is reached.
+        """
+        self.session_factory = session_factory
+        self.netlify = netlify
+        self.base_domain = base_domain
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.retry_max_delay = retry_max_delay
+        self.lease = lease
+        self._wakeup = asyncio.Event()
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: Config,
+        session_factory: async_sessionmaker,
+        netlify: AsyncNetlify,
+    ) -> "OutboxWorker":
+        return cls(
+            session_factory,
+            netlify,
+            settings.NETLIFY_DOMAIN,
+            poll_interval=settings.OUTBOX_POLL_INTERVAL,
+            batch_size=settings.OUTBOX_BATCH_SIZE,
+            max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+            retry_backoff=settings.OUTBOX_RETRY_BACKOFF,
+            retry_max_delay=settings.OUTBOX_RETRY_MAX_DELAY,
+            lease=settings.OUTBOX_LEASE,
+        )
+
+    def notify(self) -> None:
+        """Wake the worker up early, e.g. right after an operation was committed"""
+        self._wakeup.set()
+
+    async def run(self) -> None:
+        while True:
+            try:
+                processed = await self.process_due()
+            except Exception as e:
+                logger.error(f"Error processing DNS outbox: {str(e)}")
+                processed = 0
+            # Keep going while there is a backlog, otherwise sleep until
+            # notified or the next poll
+            if processed < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def process_due(self) -> int:
+        """
+        Apply one batch of due operations concurrently. Operations whose
+        lease ran out without being finished are due again.
+        Returns:
+            int: Number of operations this worker leased
+        """
+        async with self.session_factory() as db:
+            due = (
+                await db.execute(
+                    select(DnsOperation.id, DnsOperation.next_attempt_at)
+                    .where(
+                        DnsOperation.status.in_(
+                            [DnsOperation.PENDING, DnsOperation.IN_FLIGHT]
+                        ),
+                        DnsOperation.next_attempt_at <= datetime.utcnow(),
+                    )
+                    .order_by(DnsOperation.next_attempt_at, DnsOperation.id)
+                    .limit(self.batch_size)
+                )
+            ).all()
+        leased = await asyncio.gather(
+            *(self._process(op_id, next_attempt_at) for op_id, next_attempt_at in due)
+        )
+        return sum(leased)
+
+    async def _process(self, op_id: int, next_attempt_at: datetime) -> bool:
+        async with self.session_factory() as db:
+            # Compare-and-set on next_attempt_at hands the operation to exactly
+            # one worker. IN_FLIGHT keeps inline changes away from it until the
+            # worker finishes or the lease runs out.
+            lease_until = datetime.utcnow() + timedelta(seconds=self.lease)
+            leased = await db.execute(
+                update(DnsOperation)
+                .where(
+                    DnsOperation.id == op_id,
+                    DnsOperation.status.in_(
+                        [DnsOperation.PENDING, DnsOperation.IN_FLIGHT]
+                    ),
+                    DnsOperation.next_attempt_at == next_attempt_at,
+                )
+                .values(
+                    status=DnsOperation.IN_FLIGHT,
+                    next_attempt_at=lease_until,
+                    attempts=DnsOperation.attempts + 1,
+                )
+            )
+            await db.commit()
+            if leased.rowcount != 1:
+                return False
+
+            operation = await db.get(DnsOperation, op_id)
+            subdomain = (
+                await db.get(Subdomain, operation.subdomain_id)
+                if operation.subdomain_id is not None
+                else None
+            )
+            try:
+                if subdomain is None:
+                    # Deleted before its record was created
+                    outcome = {"status": DnsOperation.CANCELLED}
+                else:
+                    await self._apply(operation)
+                    outcome = {"status": DnsOperation.DONE, "last_error": None}
+            except CircuitOpenError as e:
+                # Waiting out an open breaker does not use up an attempt
+                outcome = {
+                    "status": DnsOperation.PENDING,
+                    "attempts": operation.attempts - 1,
+                    "last_error": str(e),
+                    "next_attempt_at": datetime.utcnow()
+                    + timedelta(seconds=e.retry_after),
+                }
+            except OperationRejected as e:
+                outcome = self._fail(str(e))
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 429 or e.response.is_server_error:
+                    outcome = self._retry(operation, str(e))
+                else:
+                    outcome = self._fail(str(e))
+            except Exception as e:
+                outcome = self._retry(operation, str(e))
+
+            # Only the lease holder may finish the operation: after the lease
+            # ran out another worker owns it
+            finished = await db.execute(
+                update(DnsOperation)
+                .where(
+                    DnsOperation.id == op_id,
+                    DnsOperation.status == DnsOperation.IN_FLIGHT,
+                    DnsOperation.next_attempt_at == lease_until,
+                )
+                .values(updated_at=datetime.utcnow(), **outcome)
+                .execution_options(synchronize_session=False)
+            )
+            if (
+                finished.rowcount == 1
+                and outcome["status"] == DnsOperation.FAILED
+                and subdomain is not None
+            ):
+                # Give the name back, the subdomain can never be served
+                await db.execute(delete(Subdomain).where(Subdomain.id == subdomain.id))
+                name_index.discard(subdomain.subdomain)
+            await db.commit()
+            return True
+
+    async def _apply(self, operation: DnsOperation) -> None:
+        netlify = self.netlify
+        zone_id = await netlify.get_zone_id_by_domain(self.base_domain)
+        if not zone_id:
+            raise RuntimeError("Failed to get DNS zone ID")
+
+        # A retry may follow an attempt whose record did land, so look at the
+        # zone as it is now rather than the cached index
+        if operation.attempts > 1 or not netlify.record_index.is_loaded(zone_id):
+            await netlify.get_dns_records(zone_id)
+        existing = netlify.record_index.get(
+            zone_id, operation.hostname, operation.record_type
+        )
+        if existing and existing.get("value") == operation.value:
+            return
+        if netlify.record_index.get(zone_id, operation.hostname):
+            raise OperationRejected("Subdomain already exists in Netlify DNS")
+
+        dns_record = await netlify.create_dns_record(
+            zone_id=zone_id,
+            record_type=operation.record_type,
+            hostname=operation.hostname,
+            value=operation.value,
+            ttl=operation.ttl,
+            priority=operation.priority,
+        )
+        if not dns_record:
+            raise RuntimeError("Failed to create DNS record on Netlify")
+
+    def _retry(self, operation: DnsOperation, error: str) -> Dict[str, Any]:
+        if operation.attempts >= self.max_attempts:
+            return self._fail(error)
+        delay = min(
+            self.retry_max_delay, self.retry_backoff * 2 ** (operation.attempts - 1)
+        )
+        return {
+            "status": DnsOperation.PENDING,
+            "last_error": error,
+            "next_attempt_at": datetime.utcnow() + timedelta(seconds=delay),
+        }
+
+    def _fail(self, error: str) -> Dict[str, Any]:
+        return {
+            "status": DnsOperation.FAILED,
+            "last_error": error,
+            "subdomain_id": None,
+        }
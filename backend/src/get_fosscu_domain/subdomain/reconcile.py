@@ -0,0 +1,305 @@
+"""
+Find drift between the subdomains table and the live Netlify zone.
+
+Both sides are walked in the same sorted order and compared as a merge, so
+the database is streamed in chunks instead of being loaded whole.
+
+    get-fosscu-domain-reconcile [--repair] [--delete-orphans]
+
+(or `python -m get_fosscu_domain.subdomain.reconcile` without installing).
+"""
+
+import argparse
+import asyncio
+import logging
+from itertools import groupby
+from typing import (Any, AsyncIterator, Callable, Dict, Iterator, List,
+                    Optional, Set, Tuple)
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..config import get_settings
+from ..models.dns_operation import DnsOperation
+from ..models.subdomain import Subdomain
+from ..postgres import AsyncSessionLocal
+from ..subdomain.outbox import create_operation
+from ..utils.netlify import AsyncNetlify
+
+logger = logging.getLogger(__name__)
+
+MISSING = "missing"  # row without a DNS record
+ORPHAN = "orphan"  # DNS record without a row
+MISMATCH = "mismatch"  # both exist but point at different targets
+
+
+class Drift:
+    def __init__(
+        self,
+        kind: str,
+        name: str,
+        subdomain: Optional[Subdomain] = None,
+        record: Optional[Dict[str, Any]] = None,
+    ):
+        self.kind = kind
+        self.name = name
+        self.subdomain = subdomain
+        self.record = record
+
+    def __str__(self) -> str:
+        expected = (
+            f"{self.subdomain.record_type} {self.subdomain.target_domain}"
+            if self.subdomain is not None
+            else "-"
+        )
+        actual = (
+            f"{self.record.get('type')} {self.record.get('value')}"
+            if self.record is not None
+            else "-"
+        )
+        return f"{self.kind:<8} {self.name:<40} db: {expected:<40} dns: {actual}"
+
+
+class ReconcileReport:
+    """Counts of what a reconciliation run compared, found and repaired"""
+
+    def __init__(self):
+        self.rows = 0
+        self.records = 0
+        self.drift = {MISSING: 0, ORPHAN: 0, MISMATCH: 0}
+        self.repaired = 0
+        self.skipped = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "records": self.records,
+            **self.drift,
+            "repaired": self.repaired,
+            "skipped": self.skipped,
+        }
+
+
+def _normalize_value(value: Optional[str]) -> str:
+    return (value or "").rstrip(".").lower()
+
+
+def _matches(subdomain: Subdomain, record: Dict[str, Any]) -> bool:
+    return (record.get("type") or "").upper() == (
+        subdomain.record_type or ""
+    ).upper() and _normalize_value(record.get("value")) == _normalize_value(
+        subdomain.target_domain
+    )
+
+
+def sorted_zone_records(
+    records: List[Dict[str, Any]], base_domain: str
+) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    Records one label below `base_domain`, grouped by that label and sorted
+    the way `stream_subdomains` orders rows. Deeper names and the apex are
+    not managed by this app and are left out.
+    """
+    suffix = f".{base_domain.lower()}"
+    labelled = []
+    for record in records:
+        hostname = (record.get("hostname") or "").rstrip(".").lower()
+        if hostname.endswith(suffix):
+            label = hostname[: -len(suffix)]
+            if label and "." not in label:
+                labelled.append((label, record))
+    labelled.sort(key=lambda item: item[0])
+    for label, group in groupby(labelled, key=lambda item: item[0]):
+        yield label, [record for _, record in group]
+
+
+async def stream_subdomains(
+    db: AsyncSession, chunk_size: int = 1000
+) -> AsyncIterator[Tuple[str, Subdomain]]:
+    """
+    Yield (lowercase name, row) ordered by code point, fetching `chunk_size`
+    rows at a time
+    """
+    name = func.lower(Subdomain.subdomain)
+    if db.bind.dialect.name == "postgresql":
+        # Locale collations sort '-' and '.' differently from Python
+        name = name.collate("C")
+    result = await db.stream(
+        select(Subdomain)
+        .order_by(name, Subdomain.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    async for subdomain in result.scalars():
+        yield subdomain.subdomain.lower(), subdomain
+
+
+async def diff(
+    rows: AsyncIterator[Tuple[str, Subdomain]],
+    records: Iterator[Tuple[str, List[Dict[str, Any]]]],
+) -> AsyncIterator[Drift]:
+    """Merge two name-sorted streams and yield every disagreement"""
+    record = next(records, None)
+    async for name, subdomain in rows:
+        while record is not None and record[0] < name:
+            for orphan in record[1]:
+                yield Drift(ORPHAN, record[0], record=orphan)
+            record = next(records, None)
+        if record is None or record[0] != name:
+            yield Drift(MISSING, name, subdomain=subdomain)
+            continue
+        if not any(_matches(subdomain, r) for r in record[1]):
+            yield Drift(MISMATCH, name, subdomain=subdomain, record=record[1][0])
+        record = next(records, None)
+    while record is not None:
+        for orphan in record[1]:
+            yield Drift(ORPHAN, record[0], record=orphan)
+        record = next(records, None)
+
+
+async def reconcile(
+    session_factory: async_sessionmaker,
+    netlify: AsyncNetlify,
+    base_domain: str,
+    repair: bool = False,
+    delete_orphans: bool = False,
+    on_drift: Optional[Callable[[Drift], None]] = None,
+) -> ReconcileReport:
+    """
+    Compare the subdomains table with the Netlify zone of `base_domain`
+    Args:
+        session_factory (async_sessionmaker): Database session factory
+        netlify (AsyncNetlify): Client used to read and repair the zone
+        base_domain (str): Domain the subdomains live under
+        repair (bool, optional): Queue missing records and fix mismatches
+        delete_orphans (bool, optional): Also delete records without a row
+        on_drift (callable, optional): Called with each Drift as it is found
+    Returns:
+        ReconcileReport: What was compared, found and repaired
+    """
+    report = ReconcileReport()
+    zone_id = await netlify.get_zone_id_by_domain(base_domain)
+    if not zone_id:
+        raise RuntimeError(f"No Netlify DNS zone for {base_domain}")
+    zone_records = await netlify.get_dns_records(zone_id)
+    report.records = len(zone_records)
+
+    async with session_factory() as writer:
+        async with session_factory() as db:
+            # Rows whose record is still queued are in flight, not drifted
+            queued: Set[int] = set(
+                (
+                    await db.scalars(
+                        select(DnsOperation.subdomain_id).where(
+                            DnsOperation.status.in_(
+                                [DnsOperation.PENDING, DnsOperation.IN_FLIGHT]
+                            )
+                        )
+                    )
+                ).all()
+            )
+
+            async def counted_rows():
+                async for item in stream_subdomains(db):
+                    report.rows += 1
+                    yield item
+
+            async for drift in diff(
+                counted_rows(), sorted_zone_records(zone_records, base_domain)
+            ):
+                if drift.kind == MISSING and drift.subdomain.id in queued:
+                    continue
+                report.drift[drift.kind] += 1
+                if on_drift is not None:
+                    on_drift(drift)
+                if not repair or (drift.kind == ORPHAN and not delete_orphans):
+                    report.skipped += 1
+                    continue
+                try:
+                    await _repair(writer, netlify, zone_id, base_domain, drift)
+                    report.repaired += 1
+                except Exception as e:
+                    report.skipped += 1
+                    logger.error(f"Error repairing {drift.kind} {drift.name}: {str(e)}")
+        # Queued creates are written once the read side has let go
+        await writer.commit()
+    return report
+
+
+async def _repair(
+    writer: AsyncSession,
+    netlify: AsyncNetlify,
+    zone_id: str,
+    base_domain: str,
+    drift: Drift,
+) -> None:
+    if drift.kind == MISSING:
+        # Let the outbox worker create it, with its retries and leasing
+        writer.add(create_operation(drift.subdomain, base_domain))
+    elif drift.kind == MISMATCH:
+        subdomain = drift.subdomain
+        await netlify.update_dns_record(
+            zone_id=zone_id,
+            record_id=drift.record["id"],
+            record_type=subdomain.record_type,
+            hostname=f"{subdomain.subdomain}.{base_domain}",
+            value=subdomain.target_domain,
+            ttl=subdomain.ttl,
+            priority=subdomain.priority if subdomain.record_type == "MX" else None,
+        )
+    elif drift.kind == ORPHAN:
+        await netlify.remove_dns_record(zone_id, drift.record["id"])
+
+
+async def run_reconciliation(
+    session_factory: async_sessionmaker,
+    netlify: AsyncNetlify,
+    base_domain: str,
+    interval: float,
+    repair: bool = False,
+) -> None:
+    """Periodically reconcile and report drift; orphans are never deleted"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            report = await reconcile(session_factory, netlify, base_domain, repair)
+            logger.info(f"DNS reconciliation: {report.stats()}", extra=report.stats())
+        except Exception as e:
+            logger.error(f"Error reconciling DNS with the database: {str(e)}")
+
+
+async def _main(args: argparse.Namespace) -> ReconcileReport:
+    settings = get_settings()
+    async with AsyncNetlify.from_settings(settings) as netlify:
+        return await reconcile(
+            AsyncSessionLocal,
+            netlify,
+            args.domain or settings.NETLIFY_DOMAIN,
+            repair=args.repair,
+            delete_orphans=args.delete_orphans,
+            on_drift=print,
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Report drift between the subdomains table and Netlify DNS"
+    )
+    parser.add_argument("--domain", help="Zone to check (default: NETLIFY_DOMAIN)")
+    parser.add_argument(
+        "--repair",
+        action="store_true",
+        help="Queue missing records and rewrite mismatched ones",
+    )
+    parser.add_argument(
+        "--delete-orphans",
+        action="store_true",
+        help="With --repair, also delete records that have no subdomain row",
+    )
+    args = parser.parse_args(argv)
+    report = asyncio.run(_main(args))
+    print(report.stats())
+    return 1 if any(report.drift.values()) and not args.repair else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
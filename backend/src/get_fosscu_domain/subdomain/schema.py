@@ -1,9 +1,23 @@
 import re
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, validator
 
+MAX_BATCH_SIZE = 200
+
+
+def validate_subdomain_name(v: str) -> str:
+    # Check if subdomain contains only allowed characters
+    if not re.match("^[a-zA-Z0-9-]+$", v):
+        raise ValueError("Subdomain can only contain letters, numbers, and hyphens")
+
+    # Check length constraints
+    if len(v) < 3 or len(v) > 63:
+        raise ValueError("Subdomain must be between 3 and 63 characters")
+
+    return v.lower()
+
 
 class SubdomainCreate(BaseModel):
     subdomain: str
@@ -14,15 +28,7 @@ class SubdomainCreate(BaseModel):
 
     @validator("subdomain")
     def validate_subdomain(cls, v):
-        # Check if subdomain contains only allowed characters
-        if not re.match("^[a-zA-Z0-9-]+$", v):
-            raise ValueError("Subdomain can only contain letters, numbers, and hyphens")
-
-        # Check length constraints
-        if len(v) < 3 or len(v) > 63:
-            raise ValueError("Subdomain must be between 3 and 63 characters")
-
-        return v.lower()
+        return validate_subdomain_name(v)
 
     @validator("record_type")
     def validate_record_type(cls, v):
@@ -52,3 +58,73 @@ class SubdomainResponse(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class SubdomainFields(BaseModel):
+    """A subdomain listing entry; only the fields that were asked for are set"""
+
+    id: Optional[int] = None
+    subdomain: Optional[str] = None
+    target_domain: Optional[str] = None
+    record_type: Optional[str] = None
+    ttl: Optional[int] = None
+    priority: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class SubdomainBatchCreate(BaseModel):
+    subdomains: List[SubdomainCreate]
+
+    @validator("subdomains")
+    def validate_batch_size(cls, v):
+        if not 1 <= len(v) <= MAX_BATCH_SIZE:
+            raise ValueError(f"A batch must contain 1 to {MAX_BATCH_SIZE} subdomains")
+        return v
+
+
+class SubdomainBatchDelete(BaseModel):
+    ids: List[int]
+
+    @validator("ids")
+    def validate_batch_size(cls, v):
+        if not 1 <= len(v) <= MAX_BATCH_SIZE:
+            raise ValueError(f"A batch must contain 1 to {MAX_BATCH_SIZE} ids")
+        return v
+
+
+class SubdomainBatchItemResult(BaseModel):
+    subdomain: Optional[str] = None
+    id: Optional[int] = None
+    # DNS operation creating the record, for batch creates
+    operation_id: Optional[int] = None
+    success: bool
+    detail: Optional[str] = None
+    data: Optional[SubdomainResponse] = None
+
+
+class SubdomainBatchResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[SubdomainBatchItemResult]
+
+
+class SubdomainAvailability(BaseModel):
+    subdomain: str
+    available: bool
+    reason: Optional[str] = None
+
+
+class DnsOperationResponse(BaseModel):
+    id: int
+    action: str
+    status: str
+    subdomain_id: Optional[int]
+    hostname: str
+    attempts: int
+    last_error: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
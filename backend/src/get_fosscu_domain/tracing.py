@@ -0,0 +1,226 @@
+"""
+Optional OpenTelemetry tracing.
+
+Tracing is off unless TRACING_ENABLED is set and the `tracing` extra is
+installed. Until `init_tracing` runs, `span` and `traced` cost one
+attribute check, so the instrumented code paths can stay in place.
+"""
+
+import functools
+import inspect
+import os
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import Config
+from .metrics import route_template
+
+try:
+    from opentelemetry import propagate, trace
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:  # tracing is an optional extra
+    trace = None
+
+TRACER_NAME = "get_fosscu_domain"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Set by init_tracing; None keeps every span a no-op
+_tracer = None
+
+
+def init_tracing(settings: Config, exporter: Any = None) -> Any:
+    """
+    Install a tracer provider that samples TRACING_SAMPLE_RATIO of new traces
+    (requests with a sampled parent are always kept) and batches spans to
+    the configured exporter
+    Args:
+        settings (Config): Application settings
+        exporter (SpanExporter, optional): Overrides TRACING_EXPORTER
+    Returns:
+        TracerProvider: Flush or shut it down to drain pending spans
+    """
+    global _tracer
+    if trace is None:
+        raise RuntimeError(
+            "TRACING_ENABLED needs the OpenTelemetry SDK: install the 'tracing' extra"
+        )
+    from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    provider = TracerProvider(
+        resource=Resource.create({SERVICE_NAME: settings.TRACING_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)),
+    )
+    provider.add_span_processor(
+        BatchSpanProcessor(exporter or _build_exporter(settings))
+    )
+    _tracer = provider.get_tracer(TRACER_NAME)
+    return provider
+
+
+def _build_exporter(settings: Config) -> Any:
+    if settings.TRACING_EXPORTER == "file":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+        class FileSpanExporter(ConsoleSpanExporter):
+            def shutdown(self) -> None:
+                # Shutting the tracer provider down shuts its exporters down
+                super().shutdown()
+                self.out.close()
+
+        # One JSON span per line, readable without a collector
+        return FileSpanExporter(
+            out=open(settings.TRACING_FILE_PATH, "a"),
+            formatter=lambda span: span.to_json(indent=None) + os.linesep,
+        )
+    if settings.TRACING_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import \
+            OTLPSpanExporter
+
+        return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+    raise ValueError(f"Unknown TRACING_EXPORTER: {settings.TRACING_EXPORTER}")
+
+
+def disable_tracing() -> None:
+    global _tracer
+    _tracer = None
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """Trace the enclosed block as a child of the current span"""
+    if _tracer is None:
+        yield None
+        return
+    with _tracer.start_as_current_span(name, attributes=attributes) as current:
+        yield current
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Trace every call of a sync or async function"""
+
+    def decorator(fn: F) -> F:
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if _tracer is None:
+                    return await fn(*args, **kwargs)
+                with _tracer.start_as_current_span(name):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _tracer is None:
+                return fn(*args, **kwargs)
+            with _tracer.start_as_current_span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class TracingMiddleware:
+    def __init__(self, app: ASGIApp):
+        """
+        Opens a server span per HTTP request, continuing the caller's trace
+        when a `traceparent` header is sent. Named after the route template
+        once routing has matched one.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or _tracer is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = {
+            k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]
+        }
+        with _tracer.start_as_current_span(
+            scope["method"],
+            context=propagate.extract(headers),
+            kind=SpanKind.SERVER,
+            attributes={
+                "http.request.method": scope["method"],
+                "url.path": scope["path"],
+            },
+        ) as current:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    current.set_attribute(
+                        "http.response.status_code", message["status"]
+                    )
+                    if message["status"] >= 500:
+                        current.set_status(Status(StatusCode.ERROR))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = route_template(scope)
+                if route != "unmatched":
+                    current.set_attribute("http.route", route)
+                    current.update_name(f"{scope['method']} {route}")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    if _tracer is None:
+        return
+    verb = statement.lstrip().split(None, 1)[0].upper() if statement else "SQL"
+    current = _tracer.start_span(
+        verb,
+        kind=SpanKind.CLIENT,
+        attributes={
+            "db.system": conn.dialect.name,
+            "db.query.text": statement,
+        },
+    )
+    conn.info.setdefault("trace_spans", []).append(current)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    spans = conn.info.get("trace_spans")
+    if spans:
+        spans.pop().end()
+
+
+def _handle_error(context):
+    spans = (
+        context.connection.info.get("trace_spans")
+        if context.connection is not None
+        else None
+    )
+    if spans:
+        current = spans.pop()
+        current.record_exception(context.original_exception)
+        current.set_status(Status(StatusCode.ERROR))
+        current.end()
+
+
+_ENGINE_LISTENERS = {
+    "before_cursor_execute": _before_cursor_execute,
+    "after_cursor_execute": _after_cursor_execute,
+    "handle_error": _handle_error,
+}
+
+
+def trace_engine(engine: Engine) -> None:
+    """
+    Open a client span around every statement the engine executes. Calling
+    it again for the same engine (every app startup does) is a no-op.
+    """
+    for name, listener in _ENGINE_LISTENERS.items():
+        if not event.contains(engine, name, listener):
+            event.listen(engine, name, listener)
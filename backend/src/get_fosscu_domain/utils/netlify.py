@@ -1,82 +1,646 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
 from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
 
+from ..config import Config
+from ..metrics import NETLIFY_REQUEST_LATENCY
+from ..tracing import traced
 
-class Netlify:
-    def __init__(self, access_token: str):
+logger = logging.getLogger(__name__)
+
+NETLIFY_API_URL = "https://api.netlify.com/api/v1"
+
+# Netlify's documented API quota is 500 requests per minute per token
+NETLIFY_REQUESTS_PER_MINUTE = 500
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# Failures raised before the request left the client, so even a POST can be
+# sent again without risking a duplicate record
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
         """
-        Initialize the checker with your Netlify personal access token
+        Client-side throttle refilling `rate` tokens per second up to
+        `capacity`. Each call reserves a token and is told how long to wait
+        for it, so concurrent callers are spaced out in arrival order.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        if now > self._updated:
+            elapsed = now - self._updated
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def reserve(self) -> float:
+        """Take a token and return the seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            return max(0.0, self._updated - now) + max(0.0, -self._tokens) / self.rate
+
+    def defer(self, seconds: float) -> None:
+        """Hold back every caller for `seconds`, e.g. after the API sent a 429"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = max(self._updated, now + seconds)
+
+
+def _parse_retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    def __init__(
+        self, max_retries: int = 3, backoff: float = 0.5, max_delay: float = 30.0
+    ):
+        """
+        Retries with full-jitter exponential backoff. Only idempotent methods
+        are retried after the server may have seen the request; a POST is
+        retried only when it never left the client or was rejected with 429.
+        """
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_delay = max_delay
+
+    def delay(
+        self,
+        method: str,
+        attempt: int,
+        response: Optional[httpx.Response] = None,
+        error: Optional[httpx.RequestError] = None,
+    ) -> Optional[float]:
+        """
+        Seconds to wait before retrying, or None if the call must not be retried
+        Args:
+            method (str): HTTP method of the failed call
+            attempt (int): Number of retries already made
+            response (httpx.Response, optional): The response, if one arrived
+            error (httpx.RequestError, optional): The transport error otherwise
+        Returns:
+            Optional[float]: Delay in seconds, or None to give up
+        """
+        if attempt >= self.max_retries:
+            return None
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        if error is not None:
+            if not idempotent and not isinstance(error, UNSENT_ERRORS):
+                return None
+        elif response.status_code not in RETRY_STATUS_CODES:
+            return None
+        elif not idempotent and response.status_code != httpx.codes.TOO_MANY_REQUESTS:
+            return None
+
+        retry_after = _parse_retry_after(response) if response is not None else None
+        if retry_after is not None:
+            # Waiting longer than we are willing to means failing now
+            return retry_after if retry_after <= self.max_delay else None
+        return random.uniform(0, min(self.max_delay, self.backoff * 2**attempt))
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling Netlify while the circuit breaker is open"""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Netlify circuit breaker is open")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        slow_call_threshold: float = 5.0,
+    ):
+        """
+        Stops calling Netlify after `failure_threshold` consecutive failed or
+        slower than `slow_call_threshold` calls. After `reset_timeout` seconds
+        one probe call is let through; its outcome closes or reopens the
+        circuit.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.slow_call_threshold = slow_call_threshold
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self.rejected = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def _retry_after(self) -> float:
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def check(self) -> None:
+        """Raise CircuitOpenError if a call would be rejected right now"""
+        with self._lock:
+            if self.state == self.OPEN or (
+                self.state == self.HALF_OPEN and self._probing
+            ):
+                raise CircuitOpenError(self._retry_after())
+
+    def before_call(self) -> None:
+        """Admit a call, claiming the single probe slot when half-open"""
+        with self._lock:
+            state = self.state
+            if state == self.OPEN or (state == self.HALF_OPEN and self._probing):
+                self.rejected += 1
+                raise CircuitOpenError(self._retry_after())
+            if state == self.HALF_OPEN:
+                self._probing = True
+
+    def record_success(self, elapsed: float) -> None:
+        if elapsed > self.slow_call_threshold:
+            self.record_failure()
+            return
+        with self._lock:
+            self.consecutive_failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            if self._probing or (
+                self._opened_at is None
+                and self.consecutive_failures >= self.failure_threshold
+            ):
+                self.times_opened += 1
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def release(self) -> None:
+        """Give back an admitted call that ended without an outcome"""
+        with self._lock:
+            self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+
+class NetlifyRequestMetrics:
+    """Running totals of retries and client-side throttling of API calls"""
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.throttled = 0
+        self.throttle_wait_total = 0.0
+
+    def observe_throttle(self, seconds: float) -> None:
+        if seconds > 0:
+            self.throttled += 1
+            self.throttle_wait_total += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "throttled": self.throttled,
+            "throttle_wait_s_total": round(self.throttle_wait_total, 3),
+        }
+
+
+class ZoneIdCache:
+    def __init__(self, ttl: float = 3600.0):
+        """
+        Domain to DNS zone ID cache. Zone IDs practically never change, so
+        entries live for `ttl` seconds or until a Netlify 404 invalidates them.
+        Args:
+            ttl (float, optional): Seconds an entry stays valid. Defaults to 3600.
+        """
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, Tuple[str, float]] = {}
+
+    def get(self, domain: str) -> Optional[str]:
+        entry = self._entries.get(domain)
+        if entry is None or entry[1] <= time.monotonic():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def peek(self, domain: str) -> Optional[str]:
+        """Return a valid cached zone ID without counting a hit or miss"""
+        entry = self._entries.get(domain)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        return entry[0]
+
+    def set(self, domain: str, zone_id: str) -> None:
+        self._entries[domain] = (zone_id, time.monotonic() + self.ttl)
+
+    def invalidate(self, domain: Optional[str] = None) -> None:
+        if domain is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(domain, None)
+
+    def invalidate_zone(self, zone_id: str) -> None:
+        for domain, (cached_id, _) in list(self._entries.items()):
+            if cached_id == zone_id:
+                del self._entries[domain]
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+class DnsRecordIndex:
+    def __init__(self):
+        """
+        In-process hostname to DNS records mirror, one table per zone. A zone
+        is bulk-loaded from Netlify once and then kept current by our own
+        writes, so record lookups are dict hits instead of zone downloads.
+        A hostname can hold several records (e.g. TXT next to MX), so each
+        maps to its records by ID.
+        """
+        self._records: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]] = {}
+        self._hostnames: Dict[str, Dict[str, str]] = {}
+
+    @staticmethod
+    def _normalize(hostname: str) -> str:
+        return hostname.lower().rstrip(".")
+
+    def zone_ids(self) -> List[str]:
+        return list(self._records)
+
+    def is_loaded(self, zone_id: str) -> bool:
+        return zone_id in self._records
+
+    def load(self, zone_id: str, records: List[Dict[str, Any]]) -> None:
+        by_hostname: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        hostnames = {}
+        for record in records:
+            hostname = self._normalize(record.get("hostname", ""))
+            by_hostname.setdefault(hostname, {})[record.get("id")] = record
+            hostnames[record.get("id")] = hostname
+        self._records[zone_id] = by_hostname
+        self._hostnames[zone_id] = hostnames
+
+    def drop(self, zone_id: str) -> None:
+        self._records.pop(zone_id, None)
+        self._hostnames.pop(zone_id, None)
+
+    def get(
+        self, zone_id: str, hostname: str, record_type: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """A record of the hostname, of `record_type` if given"""
+        records = self._records.get(zone_id, {}).get(self._normalize(hostname), {})
+        for record in records.values():
+            if record_type is None or record.get("type") == record_type:
+                return record
+        return None
+
+    def put(self, zone_id: str, record: Dict[str, Any]) -> None:
+        if not self.is_loaded(zone_id):
+            return
+        self.discard(zone_id, record.get("id"))
+        hostname = self._normalize(record.get("hostname", ""))
+        self._records[zone_id].setdefault(hostname, {})[record.get("id")] = record
+        self._hostnames[zone_id][record.get("id")] = hostname
+
+    def discard(self, zone_id: str, record_id: str) -> None:
+        hostname = self._hostnames.get(zone_id, {}).pop(record_id, None)
+        if hostname is None:
+            return
+        records = self._records[zone_id].get(hostname, {})
+        records.pop(record_id, None)
+        if not records:
+            self._records[zone_id].pop(hostname, None)
+
+    def __len__(self) -> int:
+        return sum(len(hostnames) for hostnames in self._hostnames.values())
+
+
+def _client_options(settings: Config) -> Dict[str, Any]:
+    return {
+        "access_token": settings.NETLIFY_ACCESS_KEY,
+        "base_url": settings.NETLIFY_API_URL,
+        "http2": settings.NETLIFY_HTTP2,
+        "limits": httpx.Limits(
+            max_connections=settings.NETLIFY_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.NETLIFY_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.NETLIFY_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(
+            settings.NETLIFY_TIMEOUT, connect=settings.NETLIFY_CONNECT_TIMEOUT
+        ),
+        "zone_cache_ttl": settings.NETLIFY_ZONE_CACHE_TTL,
+        "requests_per_minute": settings.NETLIFY_REQUESTS_PER_MINUTE,
+        "burst": settings.NETLIFY_REQUEST_BURST,
+        "retry": RetryPolicy(
+            max_retries=settings.NETLIFY_MAX_RETRIES,
+            backoff=settings.NETLIFY_RETRY_BACKOFF,
+            max_delay=settings.NETLIFY_RETRY_MAX_DELAY,
+        ),
+        "breaker": CircuitBreaker(
+            failure_threshold=settings.NETLIFY_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.NETLIFY_BREAKER_RESET_TIMEOUT,
+            slow_call_threshold=settings.NETLIFY_BREAKER_SLOW_CALL_THRESHOLD,
+        ),
+    }
+
+
+def _record_payload(
+    record_type: str,
+    hostname: str,
+    value: str,
+    ttl: int,
+    priority: Optional[int],
+) -> Dict[str, Any]:
+    payload = {
+        "type": record_type.upper(),
+        "hostname": hostname,
+        "value": value,
+        "ttl": ttl,
+    }
+
+    if priority is not None and record_type.upper() == "MX":
+        payload["priority"] = priority
+
+    return payload
+
+
+def _find_zone_id(zones: List[Dict[str, Any]], domain: str) -> Optional[str]:
+    for zone in zones:
+        if zone.get("name") == domain:
+            return zone.get("id")
+    return None
+
+
+def _filter_sites_with_domains(sites: List[Dict[str, Any]]) -> List[dict]:
+    sites_with_domains = []
+    for site in sites:
+        # Custom domains are directly available in the site object
+        custom_domain = site.get("custom_domain")
+        if custom_domain:
+            sites_with_domains.append(
+                {
+                    "name": site["name"],
+                    "domain": custom_domain,
+                    "url": site["url"],
+                }
+            )
+    return sites_with_domains
+
+
+class AsyncNetlify:
+    def __init__(
+        self,
+        access_token: str,
+        base_url: str = NETLIFY_API_URL,
+        http2: bool = True,
+        limits: Optional[httpx.Limits] = None,
+        timeout: Optional[httpx.Timeout] = None,
+        zone_cache_ttl: float = 3600.0,
+        requests_per_minute: int = NETLIFY_REQUESTS_PER_MINUTE,
+        burst: int = 25,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        """
+        Netlify API client built on a pooled httpx.AsyncClient, so DNS calls
+        can be awaited without blocking the event loop.
         Args:
             access_token (str): Your Netlify personal access token
+            base_url (str, optional): Netlify API base URL
+            http2 (bool, optional): Negotiate HTTP/2 with the API. Defaults to True.
+            limits (httpx.Limits, optional): Connection pool limits
+            timeout (httpx.Timeout, optional): Request timeouts
+            zone_cache_ttl (float, optional): Seconds a resolved zone ID is reused
+            requests_per_minute (int, optional): Client-side API request budget
+            burst (int, optional): Requests allowed back to back before throttling
+            retry (RetryPolicy, optional): How failed calls are retried
+            breaker (CircuitBreaker, optional): Fails calls fast during outages
         """
-        self.base_url = "https://api.netlify.com/api/v1"
+        self.base_url = base_url
         self.headers = {
             "Authorization": f"Bearer {access_token}",
             "Content-Type": "application/json",
         }
+        self.client = httpx.AsyncClient(
+            headers=self.headers,
+            http2=http2,
+            limits=limits or httpx.Limits(),
+            timeout=timeout or httpx.Timeout(10.0),
+        )
+        self.zone_cache = ZoneIdCache(ttl=zone_cache_ttl)
+        self.record_index = DnsRecordIndex()
+        self.bucket = TokenBucket(rate=requests_per_minute / 60, capacity=burst)
+        self.retry = retry or RetryPolicy()
+        self.metrics = NetlifyRequestMetrics()
+        self.breaker = breaker or CircuitBreaker()
+
+    @classmethod
+    def from_settings(cls, settings: Config) -> "AsyncNetlify":
+        """
+        Build a client using the pool and timeout options from the settings
+        Args:
+            settings (Config): Application settings
+        Returns:
+            AsyncNetlify: A client ready to be shared across requests
+        """
+        return cls(**_client_options(settings))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Request counters and circuit breaker state for health reporting
+        """
+        return {**self.metrics.stats(), "breaker": self.breaker.stats()}
+
+    async def close(self) -> None:
+        """
+        Close the underlying connection pool
+        """
+        await self.client.aclose()
+
+    async def __aenter__(self) -> "AsyncNetlify":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def _request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        Send an API request through the throttle, retrying transient failures
+        the retry policy allows. The last response is returned once retries
+        are exhausted so callers still see the error status.
+        """
+        attempt = 0
+        while True:
+            wait = self.bucket.reserve()
+            self.metrics.observe_throttle(wait)
+            if wait:
+                await asyncio.sleep(wait)
+            self.breaker.before_call()
+            self.metrics.requests += 1
+            start_time = time.perf_counter()
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except httpx.RequestError as e:
+                NETLIFY_REQUEST_LATENCY.labels(method, "error").observe(
+                    time.perf_counter() - start_time
+                )
+                self.breaker.record_failure()
+                delay = self.retry.delay(method, attempt, error=e)
+                if delay is None:
+                    raise
+            except BaseException:
+                self.breaker.release()
+                raise
+            else:
+                elapsed = time.perf_counter() - start_time
+                NETLIFY_REQUEST_LATENCY.labels(
+                    method, str(response.status_code)
+                ).observe(elapsed)
+                # Throttling is handled by the bucket; only outages trip the breaker
+                if response.is_server_error:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success(elapsed)
+                if response.status_code == httpx.codes.TOO_MANY_REQUESTS:
+                    self.metrics.rate_limited += 1
+                delay = self.retry.delay(method, attempt, response=response)
+                if delay is None:
+                    return response
+                if response.status_code == httpx.codes.TOO_MANY_REQUESTS:
+                    self.bucket.defer(delay)
+                await response.aclose()
+            attempt += 1
+            self.metrics.retries += 1
+            await asyncio.sleep(delay)
+
+    def _check_zone_response(self, zone_id: str, response: httpx.Response) -> None:
+        # A 404 on the zone's own URLs means the cached zone ID went stale
+        if response.status_code == httpx.codes.NOT_FOUND:
+            self.zone_cache.invalidate_zone(zone_id)
+            self.record_index.drop(zone_id)
 
-    def get_dns_zones(self) -> List[Dict[str, Any]]:
+    def _check_record_response(
+        self, zone_id: str, record_id: str, response: httpx.Response
+    ) -> None:
+        # A 404 on a record's URL only says the record is gone, the zone and
+        # its other records stay cached
+        if response.status_code == httpx.codes.NOT_FOUND:
+            self.record_index.discard(zone_id, record_id)
+
+    @traced("netlify.ping")
+    async def ping(self) -> None:
+        """
+        Make one cheap authenticated call to check that Netlify is reachable
+        Raises:
+            CircuitOpenError: The circuit breaker is open
+            httpx.HTTPError: Netlify could not be reached or answered an error
+        """
+        response = await self._request("GET", f"{self.base_url}/dns_zones")
+        response.raise_for_status()
+
+    @traced("netlify.get_dns_zones")
+    async def get_dns_zones(self) -> List[Dict[str, Any]]:
         """
         Get all DNS zones associated with your account
         Returns:
             List[Dict[str, Any]]: List of DNS zones
         """
         try:
-            response = httpx.get(f"{self.base_url}/dns_zones", headers=self.headers)
+            response = await self._request("GET", f"{self.base_url}/dns_zones")
             response.raise_for_status()
             return response.json()
         except httpx.RequestError as e:
-            print(f"Error fetching DNS zones: {str(e)}")
+            logger.error(f"Error fetching DNS zones: {str(e)}")
             return []
 
-    def get_zone_id_by_domain(self, domain: str) -> Optional[str]:
+    @traced("netlify.get_zone_id_by_domain")
+    async def get_zone_id_by_domain(self, domain: str) -> Optional[str]:
         """
         Get the DNS zone ID for a specific domain
         Args:
             domain (str): The domain name to look up
         Returns:
             Optional[str]: The zone ID if found, None otherwise
+        Raises:
+            CircuitOpenError: The circuit breaker is open
         """
+        zone_id = self.zone_cache.get(domain)
+        if zone_id:
+            return zone_id
         try:
-            zones = self.get_dns_zones()
-            for zone in zones:
-                if zone.get("name") == domain:
-                    return zone.get("id")
-            return None
-        except Exception as e:
-            print(f"Error getting zone ID for domain {domain}: {str(e)}")
+            zone_id = _find_zone_id(await self.get_dns_zones(), domain)
+            if zone_id:
+                self.zone_cache.set(domain, zone_id)
+            return zone_id
+        except (httpx.HTTPError, ValueError) as e:
+            # An open breaker propagates so callers back off instead of
+            # reporting a missing zone
+            logger.error(f"Error getting zone ID for domain {domain}: {str(e)}")
             return None
 
-    def get_site_info(self) -> List[dict]:
+    @traced("netlify.get_site_info")
+    async def get_site_info(self) -> List[dict]:
         """
         Get all sites and their custom domains owned by the user
         Returns:
             List[dict]: List of site information including domains
         """
         try:
-            response = httpx.get(f"{self.base_url}/sites", headers=self.headers)
+            response = await self._request("GET", f"{self.base_url}/sites")
             response.raise_for_status()
-            sites = response.json()
             # Filter sites with custom domains
-            sites_with_domains = []
-            for site in sites:
-                # Custom domains are directly available in the site object
-                custom_domain = site.get("custom_domain")
-                if custom_domain:
-                    sites_with_domains.append(
-                        {
-                            "name": site["name"],
-                            "domain": custom_domain,
-                            "url": site["url"],
-                        }
-                    )
-            return sites_with_domains
+            return _filter_sites_with_domains(response.json())
         except httpx.RequestError as e:
-            print(f"Error fetching sites: {str(e)}")
+            logger.error(f"Error fetching sites: {str(e)}")
             return []
 
-    def check_subdomain(self, subdomain: str, domain: str) -> Tuple[bool, str]:
+    @traced("netlify.check_subdomain")
+    async def check_subdomain(self, subdomain: str, domain: str) -> Tuple[bool, str]:
         """
         Check if a subdomain is available for your custom domain
         Args:
@@ -86,26 +650,25 @@ class Netlify:
             Tuple[bool, str]: (is_available, message)
         """
         full_domain = f"{subdomain}.{domain}"
-        try:
-            # First try DNS resolution through a HEAD request
-            response = httpx.head(
-                f"https://{full_domain}", timeout=5, allow_redirects=True
-            )
-            return False, f"Subdomain '{full_domain}' is already in use."
-        except httpx.RequestError:
+        # A separate client keeps the Netlify token away from third-party hosts
+        async with httpx.AsyncClient(timeout=5, follow_redirects=True) as client:
             try:
-                # Double check with HTTP in case HTTPS is not configured
-                response = httpx.head(
-                    f"http://{full_domain}", timeout=5, allow_redirects=True
-                )
-                return (
-                    False,
-                    f"Subdomain '{full_domain}' is already in use (HTTP only).",
-                )
+                # First try DNS resolution through a HEAD request
+                await client.head(f"https://{full_domain}")
+                return False, f"Subdomain '{full_domain}' is already in use."
             except httpx.RequestError:
-                return True, f"Subdomain '{full_domain}' appears to be available!"
+                try:
+                    # Double check with HTTP in case HTTPS is not configured
+                    await client.head(f"http://{full_domain}")
+                    return (
+                        False,
+                        f"Subdomain '{full_domain}' is already in use (HTTP only).",
+                    )
+                except httpx.RequestError:
+                    return True, f"Subdomain '{full_domain}' appears to be available!"
 
-    def create_dns_record(
+    @traced("netlify.create_dns_record")
+    async def create_dns_record(
         self,
         zone_id: str,
         record_type: str,
@@ -127,58 +690,66 @@ class Netlify:
             Dict[str, Any]: The created DNS record information
         """
         try:
-            payload = {
-                "type": record_type.upper(),
-                "hostname": hostname,
-                "value": value,
-                "ttl": ttl,
-            }
+            payload = _record_payload(record_type, hostname, value, ttl, priority)
 
-            if priority is not None and record_type.upper() == "MX":
-                payload["priority"] = priority
-
-            response = httpx.post(
+            response = await self._request(
+                "POST",
                 f"{self.base_url}/dns_zones/{zone_id}/dns_records",
-                headers=self.headers,
                 json=payload,
             )
+            self._check_zone_response(zone_id, response)
             response.raise_for_status()
-            return response.json()
+            record = response.json()
+            self.record_index.put(zone_id, record)
+            return record
         except httpx.RequestError as e:
-            print(f"Error creating DNS record: {str(e)}")
+            logger.error(f"Error creating DNS record: {str(e)}")
             return {}
 
-    def get_record_id_by_subdomain(self, zone_id: str, subdomain: str) -> Optional[str]:
+    @traced("netlify.get_record_id_by_subdomain")
+    async def get_record_id_by_subdomain(
+        self, zone_id: str, subdomain: str, record_type: Optional[str] = None
+    ) -> Optional[str]:
         """
         Get the DNS record ID for a specific subdomain
         Args:
             zone_id (str): The DNS zone ID
             subdomain (str): The subdomain name to look up (without the domain)
+            record_type (str, optional): Only match a record of this type
         Returns:
             Optional[str]: The record ID if found, None otherwise
         """
+        # Only the first lookup in a zone downloads its records
+        if not self.record_index.is_loaded(zone_id):
+            await self.get_dns_records(zone_id)
+
+        record = self.record_index.get(zone_id, subdomain, record_type)
+        return record.get("id") if record else None
+
+    @traced("netlify.get_dns_records")
+    async def get_dns_records(self, zone_id: str) -> List[Dict[str, Any]]:
+        """
+        Get all DNS records for a zone and reload the local record index
+        Args:
+            zone_id (str): The DNS zone ID
+        Returns:
+            List[Dict[str, Any]]: List of DNS records
+        """
         try:
-            # Get all DNS records for the zone
-            response = httpx.get(
-                f"{self.base_url}/dns_zones/{zone_id}/dns_records", headers=self.headers
+            response = await self._request(
+                "GET", f"{self.base_url}/dns_zones/{zone_id}/dns_records"
             )
+            self._check_zone_response(zone_id, response)
             response.raise_for_status()
             records = response.json()
-
-            # Look for the record matching the subdomain
-            for record in records:
-                # The hostname in the record might be either just the subdomain
-                # or the full domain name (subdomain.domain.com)
-                hostname = record.get("hostname", "")
-                if hostname == subdomain or hostname.startswith(f"{subdomain}."):
-                    return record.get("id")
-
-            return None
+            self.record_index.load(zone_id, records)
+            return records
         except httpx.RequestError as e:
-            print(f"Error getting record ID for subdomain {subdomain}: {str(e)}")
-            return None
+            logger.error(f"Error fetching DNS records for zone {zone_id}: {str(e)}")
+            return []
 
-    def update_dns_record(
+    @traced("netlify.update_dns_record")
+    async def update_dns_record(
         self,
         zone_id: str,
         record_id: str,
@@ -202,28 +773,24 @@ class Netlify:
             Dict[str, Any]: The updated DNS record information
         """
         try:
-            payload = {
-                "type": record_type.upper(),
-                "hostname": hostname,
-                "value": value,
-                "ttl": ttl,
-            }
-
-            if priority is not None and record_type.upper() == "MX":
-                payload["priority"] = priority
+            payload = _record_payload(record_type, hostname, value, ttl, priority)
 
-            response = httpx.put(
+            response = await self._request(
+                "PUT",
                 f"{self.base_url}/dns_zones/{zone_id}/dns_records/{record_id}",
-                headers=self.headers,
                 json=payload,
             )
+            self._check_record_response(zone_id, record_id, response)
             response.raise_for_status()
-            return response.json()
+            record = response.json()
+            self.record_index.put(zone_id, record)
+            return record
         except httpx.RequestError as e:
-            print(f"Error updating DNS record: {str(e)}")
+            logger.error(f"Error updating DNS record: {str(e)}")
             return {}
 
-    def remove_dns_record(self, zone_id: str, record_id: str) -> bool:
+    @traced("netlify.remove_dns_record")
+    async def remove_dns_record(self, zone_id: str, record_id: str) -> bool:
         """
         Remove a DNS record
         Args:
@@ -233,12 +800,49 @@ class Netlify:
             bool: True if successful, False otherwise
         """
         try:
-            response = httpx.delete(
+            response = await self._request(
+                "DELETE",
                 f"{self.base_url}/dns_zones/{zone_id}/dns_records/{record_id}",
-                headers=self.headers,
             )
+            self._check_record_response(zone_id, record_id, response)
             response.raise_for_status()
+            self.record_index.discard(zone_id, record_id)
             return True
         except httpx.RequestError as e:
-            print(f"Error removing DNS record: {str(e)}")
+            logger.error(f"Error removing DNS record: {str(e)}")
             return False
+
+
+async def warm_up(netlify: AsyncNetlify, domains: List[str]) -> None:
+    """
+    Resolve the zone IDs for the given domains and bulk-load their records
+    Args:
+        netlify (AsyncNetlify): The shared client owning the caches
+        domains (List[str]): Domains whose zones the app manages
+    """
+    for domain in domains:
+        try:
+            zone_id = await netlify.get_zone_id_by_domain(domain)
+            if zone_id:
+                await netlify.get_dns_records(zone_id)
+        except Exception as e:
+            logger.error(f"Error warming up DNS caches for domain {domain}: {str(e)}")
+
+
+async def reconcile_record_index(netlify: AsyncNetlify, interval: float) -> None:
+    """
+    Periodically reload every indexed zone so changes made outside this
+    process (dashboard edits, other replicas) reach the local record index
+    Args:
+        netlify (AsyncNetlify): The shared client owning the index
+        interval (float): Seconds between reloads
+    """
+    while True:
+        await asyncio.sleep(interval)
+        for zone_id in netlify.record_index.zone_ids():
+            try:
+                await netlify.get_dns_records(zone_id)
+            except Exception as e:
+                logger.error(
+                    f"Error reconciling DNS records for zone {zone_id}: {str(e)}"
+                )
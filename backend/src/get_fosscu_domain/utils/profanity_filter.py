@@ -1,4 +1,8 @@
 import re
+from collections import deque
+from typing import Dict, Iterator, List, Tuple
+
+from ..metrics import PROFANITY_CHECK_LATENCY
 
 BAD_WORD_LIST = [
     "2g1c",
@@ -347,13 +351,91 @@ BAD_WORD_LIST = [
 ]
 
 
+_WORD = re.compile(r"\w+")
+
+
+def _is_word(char: str) -> bool:
+    # Same characters as \w, without a regex call per position
+    return char.isalnum() or char == "_"
+
+
+class ProfanityMatcher:
+    """
+    Aho-Corasick automaton over the bad word list, finding every entry in a
+    single pass over the label. A label is flagged when one of its words
+    (runs of word characters, split on hyphens and other separators) is an
+    entry, as with the previous split-and-compare check. Entries with spaces
+    or punctuation can never be a whole word and are left out.
+    """
+
+    def __init__(self, words: List[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._lengths: List[Tuple[int, ...]] = [()]
+
+        for word in words:
+            word = word.lower()
+            if not _WORD.fullmatch(word):
+                continue
+            node = 0
+            for char in word:
+                if char not in self._goto[node]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._lengths.append(())
+                    self._goto[node][char] = len(self._goto) - 1
+                node = self._goto[node][char]
+            if len(word) not in self._lengths[node]:
+                self._lengths[node] += (len(word),)
+
+        # Breadth-first pass to link each node to its longest proper suffix
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._lengths[child] += self._lengths[self._fail[child]]
+
+    def find_all(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield the (start, end) span of every entry occurring in `text`"""
+        goto, fail, lengths = self._goto, self._fail, self._lengths
+        node = 0
+        for end, char in enumerate(text, start=1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length in lengths[node]:
+                yield end - length, end
+
+    def matches(self, label: str) -> bool:
+        """Return True if a whole word of `label` is an entry"""
+        goto, fail, lengths = self._goto, self._fail, self._lengths
+        text = label.lower()
+        node = 0
+        for end, char in enumerate(text, start=1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            # Only matches that are not part of a longer word count, so
+            # "class" and "trimming" stay allowed
+            if lengths[node] and (end == len(text) or not _is_word(text[end])):
+                for length in lengths[node]:
+                    start = end - length
+                    if start == 0 or not _is_word(text[start - 1]):
+                        return True
+        return False
+
+
+_matcher = ProfanityMatcher(BAD_WORD_LIST)
+
+
 def is_profanity_found(text: str) -> bool:
     """
     Return True if any profanity word is found in the text, else return False.
     """
-    # Normalize text: convert to lowercase and split by non-alphanumeric characters
-    normalized_words = re.split(r"\W+", text.lower())
-
-    # Check for any bad word in the normalized text
-    words = set(normalized_words)
-    return not words.isdisjoint(BAD_WORD_LIST)
+    with PROFANITY_CHECK_LATENCY.time():
+        return _matcher.matches(text)
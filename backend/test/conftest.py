@@ -0,0 +1,145 @@
+import asyncio
+import os
+import tempfile
+
+_db_dir = tempfile.mkdtemp()
+
+os.environ.setdefault("NETLIFY_ACCESS_KEY", "test-netlify-key")
+os.environ.setdefault("POSTGRES_DB_URL", f"sqlite:///{_db_dir}/test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("GITHUB_CLIENT_ID", "test-client-id")
+os.environ.setdefault("GITHUB_CLIENT_SECRET", "test-client-secret")
+os.environ.setdefault("NETLIFY_DOMAIN_ZONE_ID", "zone-1")
+os.environ.setdefault("NETLIFY_DOMAIN", "fosscu.org")
+os.environ.setdefault("BASE_DOMAIN", "fosscu.org")
+
+import httpx
+import pytest
+from get_fosscu_domain.app import app
+from get_fosscu_domain.auth.auth import create_access_token, user_cache
+from get_fosscu_domain.models.dns_operation import DnsOperation  # noqa: F401
+from get_fosscu_domain.models.subdomain import Subdomain  # noqa: F401
+from get_fosscu_domain.models.user import User
+from get_fosscu_domain.postgres import (AsyncSessionLocal, Base, SessionLocal,
+                                        engine)
+from get_fosscu_domain.rate_limiting import limiter
+from get_fosscu_domain.subdomain.outbox import OutboxWorker
+from get_fosscu_domain.utils.netlify import AsyncNetlify, RetryPolicy
+
+from .fake_netlify import FakeNetlify, serve
+
+
+@pytest.fixture
+def fake_netlify():
+    fake = FakeNetlify(domain=os.environ["NETLIFY_DOMAIN"])
+    with serve(fake.app) as base_url:
+        fake.base_url = f"{base_url}/api/v1"
+        yield fake
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+        user_cache.clear()
+        limiter.reset()
+
+
+@pytest.fixture
+def user(db):
+    user = User(github_id=1, username="octocat", avatar_url="https://x/a.png")
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def auth_headers(user):
+    token = create_access_token(data={"sub": str(user.github_id)})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def drain_outbox(fake_netlify):
+    """Apply every due outbox operation against the fake Netlify"""
+
+    def drain(**worker_options):
+        async def run():
+            async with AsyncNetlify(
+                "token",
+                base_url=fake_netlify.base_url,
+                retry=RetryPolicy(backoff=0.01),
+            ) as netlify:
+                worker = OutboxWorker(
+                    AsyncSessionLocal,
+                    netlify,
+                    os.environ["NETLIFY_DOMAIN"],
+                    **worker_options,
+                )
+                while await worker.process_due():
+                    pass
+
+        asyncio.run(run())
+
+    return drain
+
+
+class Api:
+    """
+    Sends requests to the app as the test user, with the app's Netlify client
+    pointed at the fake. Every call runs in a fresh event loop.
+    """
+
+    def __init__(self, fake_netlify, headers):
+        self.fake_netlify = fake_netlify
+        self.headers = headers
+        # The app's Netlify client while a call runs
+        self.netlify = None
+
+    def run(self, send, headers=None, netlify=None, asgi_app=app):
+        """
+        Await ``send(client)`` and return its result. ``netlify`` builds the
+        Netlify client instead of the default one, ``asgi_app`` wraps the app.
+        """
+
+        async def run():
+            make_netlify = netlify or (
+                lambda: AsyncNetlify("token", base_url=self.fake_netlify.base_url)
+            )
+            async with make_netlify() as self.netlify:
+                app.state.netlify = self.netlify
+                try:
+                    async with httpx.AsyncClient(
+                        transport=httpx.ASGITransport(app=asgi_app),
+                        base_url="http://test",
+                        headers=self.headers if headers is None else headers,
+                    ) as client:
+                        return await send(client)
+                finally:
+                    del app.state.netlify
+                    self.netlify = None
+
+        return asyncio.run(run())
+
+    def request(self, method, url, **kwargs):
+        return self.run(lambda client: client.request(method, url, **kwargs))
+
+    def gather(self, method, url, payloads):
+        """Send one request per JSON payload, all at once"""
+        return self.run(
+            lambda client: asyncio.gather(
+                *(client.request(method, url, json=p) for p in payloads)
+            )
+        )
+
+
+@pytest.fixture
+def api(fake_netlify, auth_headers):
+    return Api(fake_netlify, auth_headers)
@@ -0,0 +1,59 @@
+"""
+In-memory stand-in for the GitHub OAuth and REST endpoints the login flow
+calls. Serve it with `fake_netlify.serve` and point both GITHUB_OAUTH_URL
+and GITHUB_API_URL at it.
+"""
+
+import asyncio
+import uuid
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, Form, Header, HTTPException, Request
+
+
+class FakeGitHub:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.users: Dict[str, Dict[str, Any]] = {}
+        self.tokens: Dict[str, Dict[str, Any]] = {}
+        self.calls: List[str] = []
+        self.app = self._build_app()
+
+    def add_user(self, code: str, github_id: int, login: str) -> Dict[str, Any]:
+        """Let the OAuth `code` sign in as a new GitHub user"""
+        user = {
+            "id": github_id,
+            "login": login,
+            "email": f"{login}@example.com",
+            "avatar_url": f"https://avatars.example.com/u/{github_id}",
+        }
+        self.users[code] = user
+        return user
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.middleware("http")
+        async def simulate_latency(request: Request, call_next):
+            self.calls.append(f"{request.method} {request.url.path}")
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return await call_next(request)
+
+        @app.post("/login/oauth/access_token")
+        async def access_token(code: str = Form(...)):
+            # GitHub answers a bad code with 200 and an error body
+            if code not in self.users:
+                return {"error": "bad_verification_code"}
+            token = f"gho_{uuid.uuid4().hex}"
+            self.tokens[token] = self.users[code]
+            return {"access_token": token, "token_type": "bearer"}
+
+        @app.get("/user")
+        async def current_user(authorization: str = Header("")):
+            user = self.tokens.get(authorization.removeprefix("Bearer "))
+            if user is None:
+                raise HTTPException(status_code=401, detail="Bad credentials")
+            return user
+
+        return app
@@ -0,0 +1,139 @@
+"""
+In-memory stand-in for the parts of api.netlify.com the app talks to.
+"""
+
+import asyncio
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request, Response
+
+
+class FakeNetlify:
+    def __init__(self, domain: str, zone_id: str = "zone-1", latency: float = 0.0):
+        self.domain = domain
+        self.zone_id = zone_id
+        self.latency = latency
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.calls: List[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.failures: List[Tuple[Optional[str], int, Dict[str, str]]] = []
+        self.app = self._build_app()
+
+    def fail_next(
+        self,
+        status_code: int,
+        times: int = 1,
+        headers: Optional[Dict[str, str]] = None,
+        method: Optional[str] = None,
+    ) -> None:
+        """Answer the next `times` requests (of `method`) with `status_code`"""
+        self.failures += [(method, status_code, headers or {})] * times
+
+    def _take_failure(self, method: str) -> Optional[Tuple[int, Dict[str, str]]]:
+        for index, (fail_method, status_code, headers) in enumerate(self.failures):
+            if fail_method in (None, method):
+                del self.failures[index]
+                return status_code, headers
+        return None
+
+    def add_record(self, hostname: str, value: str, record_type: str = "CNAME"):
+        record = {
+            "id": uuid.uuid4().hex,
+            "hostname": hostname,
+            "type": record_type,
+            "value": value,
+            "ttl": 3600,
+            "dns_zone_id": self.zone_id,
+        }
+        self.records[record["id"]] = record
+        return record
+
+    def _check_zone(self, zone_id: str) -> None:
+        if zone_id != self.zone_id:
+            raise HTTPException(status_code=404, detail="Not Found")
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.middleware("http")
+        async def simulate_latency(request: Request, call_next):
+            self.calls.append(f"{request.method} {request.url.path}")
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                failure = self._take_failure(request.method)
+                if failure:
+                    status_code, headers = failure
+                    return Response(status_code=status_code, headers=headers)
+                return await call_next(request)
+            finally:
+                self.in_flight -= 1
+
+        @app.get("/api/v1/dns_zones")
+        async def list_zones():
+            return [{"id": self.zone_id, "name": self.domain}]
+
+        @app.get("/api/v1/sites")
+        async def list_sites():
+            return []
+
+        @app.get("/api/v1/dns_zones/{zone_id}/dns_records")
+        async def list_records(zone_id: str):
+            self._check_zone(zone_id)
+            return list(self.records.values())
+
+        @app.post("/api/v1/dns_zones/{zone_id}/dns_records", status_code=201)
+        async def create_record(zone_id: str, payload: Dict[str, Any]):
+            self._check_zone(zone_id)
+            record = self.add_record(payload["hostname"], payload["value"])
+            record.update(payload)
+            return record
+
+        @app.put("/api/v1/dns_zones/{zone_id}/dns_records/{record_id}")
+        async def update_record(zone_id: str, record_id: str, payload: Dict[str, Any]):
+            self._check_zone(zone_id)
+            if record_id not in self.records:
+                raise HTTPException(status_code=404, detail="Not Found")
+            self.records[record_id].update(payload)
+            return self.records[record_id]
+
+        @app.delete(
+            "/api/v1/dns_zones/{zone_id}/dns_records/{record_id}", status_code=204
+        )
+        async def delete_record(zone_id: str, record_id: str):
+            self._check_zone(zone_id)
+            if self.records.pop(record_id, None) is None:
+                raise HTTPException(status_code=404, detail="Not Found")
+
+        return app
+
+
+@contextmanager
+def serve(app: FastAPI) -> Iterator[str]:
+    """
+    Run an ASGI app on a free localhost port in a background thread and
+    yield its base URL.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]})
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
+        sock.close()
@@ -0,0 +1,45 @@
+from fastapi.testclient import TestClient
+from get_fosscu_domain.app import app
+from get_fosscu_domain.auth import endpoints
+from get_fosscu_domain.auth.auth import user_cache
+
+from .fake_github import FakeGitHub
+from .fake_netlify import serve
+
+client = TestClient(app)
+
+
+def test_current_user_is_served_from_cache(auth_headers, user):
+    hits, misses = user_cache.hits, user_cache.misses
+    first = client.get("/api/v1/auth/me", headers=auth_headers)
+    second = client.get("/api/v1/auth/me", headers=auth_headers)
+
+    assert first.json() == second.json()
+    assert first.json()["username"] == "octocat"
+    assert (user_cache.hits - hits, user_cache.misses - misses) == (1, 1)
+
+    user_cache.invalidate(user.github_id)
+    assert len(user_cache) == 0
+
+
+def test_github_login_creates_the_user(db, monkeypatch):
+    github = FakeGitHub()
+    github.add_user("good-code", github_id=42, login="mona")
+    with serve(github.app) as base_url:
+        monkeypatch.setattr(endpoints, "GITHUB_OAUTH_URL", base_url)
+        monkeypatch.setattr(endpoints, "GITHUB_API_URL", base_url)
+        bad = client.get("/api/v1/auth/github/callback?code=nope")
+        response = client.get(
+            "/api/v1/auth/github/callback?code=good-code", follow_redirects=False
+        )
+
+    assert bad.status_code == 400
+    assert response.status_code == 307
+    token = response.headers["location"].partition("token=")[2]
+    me = client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {token}"})
+    assert me.json()["username"] == "mona"
+    assert github.calls == [
+        "POST /login/oauth/access_token",
+        "POST /login/oauth/access_token",
+        "GET /user",
+    ]
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from get_fosscu_domain.app import app
+from get_fosscu_domain.health.prober import HealthProber
+from get_fosscu_domain.postgres import AsyncSessionLocal
+from get_fosscu_domain.utils.netlify import AsyncNetlify, RetryPolicy
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def prober(fake_netlify):
+    """A prober checking the test database and the fake Netlify"""
+
+    def probe(session_factory=AsyncSessionLocal, **options):
+        async def run():
+            async with AsyncNetlify(
+                "token",
+                base_url=fake_netlify.base_url,
+                retry=RetryPolicy(max_retries=0),
+            ) as netlify:
+                prober = HealthProber(session_factory, netlify, **options)
+                await prober.probe()
+                return prober
+
+        app.state.health_prober = asyncio.run(run())
+        return app.state.health_prober
+
+    yield probe
+    del app.state.health_prober
+
+
+def test_livez_needs_no_database():
+    response = client.get("/api/v1/livez")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "ok"
+
+
+def test_readyz_serves_the_last_probe(fake_netlify, db, prober):
+    assert client.get("/api/v1/readyz").status_code == 503
+
+    prober()
+    calls = len(fake_netlify.calls)
+    for _ in range(5):
+        response = client.get("/api/v1/readyz")
+        assert response.status_code == 200
+
+    body = response.json()
+    assert body["status"] == "ready"
+    assert body["database"]["ok"] and body["netlify_reachable"]["ok"]
+    assert "checkouts" in body["db_pool"]
+    # Probes are answered from memory
+    assert len(fake_netlify.calls) == calls
+
+
+def test_readyz_degrades_on_netlify_and_fails_on_database(fake_netlify, db, prober):
+    fake_netlify.fail_next(503)
+    prober()
+    response = client.get("/api/v1/readyz")
+    assert response.status_code == 200
+    assert response.json()["status"] == "degraded"
+    assert "503" in response.json()["netlify_reachable"]["error"]
+
+    def broken_session():
+        raise ConnectionRefusedError("database is down")
+
+    prober(session_factory=broken_session)
+    response = client.get("/api/v1/readyz")
+    assert response.status_code == 503
+    assert response.json()["database"]["error"].endswith("database is down")
+
+    # A prober that stopped running is as bad as a failing database
+    prober(max_age=0)
+    assert client.get("/api/v1/readyz").json()["status"] == "not_ready"
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from get_fosscu_domain.app import app
+from get_fosscu_domain.logging import JsonFormatter
+from get_fosscu_domain.utils.netlify import AsyncNetlify, RetryPolicy
+
+client = TestClient(app)
+
+
+def test_access_log_carries_request_context(auth_headers, user, caplog):
+    caplog.set_level(logging.INFO, logger="get_fosscu_domain")
+
+    response = client.get(
+        "/api/v1/subdomains/42", headers={**auth_headers, "X-Request-ID": "req-1"}
+    )
+
+    assert response.headers["X-Request-ID"] == "req-1"
+    (record,) = [r for r in caplog.records if r.name == "get_fosscu_domain.access"]
+    assert record.request_id == "req-1"
+    assert record.route == "/api/v1/subdomains/{subdomain_id}"
+    assert record.user_id == user.id
+    assert record.status == 404
+    assert record.latency_ms >= 0
+
+
+def test_request_ids_are_generated(db):
+    first = client.get("/api/v1/healthz").headers["X-Request-ID"]
+    second = client.get("/api/v1/healthz").headers["X-Request-ID"]
+
+    assert first and first != second
+
+
+def test_json_formatter_includes_extra_fields_and_exceptions():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.makeLogRecord(
+            {
+                "name": "get_fosscu_domain.test",
+                "levelname": "ERROR",
+                "msg": "failed %s",
+                "args": ("here",),
+                "exc_info": sys.exc_info(),
+                "request_id": "req-2",
+                "latency_ms": 1.5,
+            }
+        )
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry["message"] == "failed here"
+    assert entry["level"] == "ERROR"
+    assert entry["request_id"] == "req-2"
+    assert entry["latency_ms"] == 1.5
+    assert "ValueError: boom" in entry["exception"]
+
+
+def test_netlify_errors_are_logged(caplog):
+    async def run():
+        async with AsyncNetlify(
+            "token",
+            base_url="http://127.0.0.1:9/api/v1",
+            retry=RetryPolicy(max_retries=0),
+        ) as netlify:
+            return await netlify.get_dns_zones()
+
+    assert asyncio.run(run()) == []
+    assert any(
+        r.levelno == logging.ERROR and r.getMessage().startswith("Error fetching DNS")
+        for r in caplog.records
+    )
+
+
+@pytest.mark.parametrize("installed", [False, True])
+def test_app_imports_through_the_src_package(installed):
+    # The image runs `uvicorn src.get_fosscu_domain.app:app`, with or without
+    # the project installed next to it
+    backend = Path(__file__).resolve().parent.parent
+    env = dict(os.environ)
+    env.pop("PYTHONPATH", None)
+    if installed:
+        env["PYTHONPATH"] = str(backend / "src")
+
+    result = subprocess.run(
+        [sys.executable, "-c", "import src.get_fosscu_domain.app"],
+        cwd=backend,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,76 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from get_fosscu_domain.app import app, configure_metrics
+from get_fosscu_domain.metrics import REGISTRY
+from get_fosscu_domain.postgres import AsyncSessionLocal
+from get_fosscu_domain.utils.netlify import AsyncNetlify
+from get_fosscu_domain.utils.profanity_filter import is_profanity_found
+from sqlalchemy import text
+
+client = TestClient(app)
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_requests_are_timed_by_route_template(auth_headers, user):
+    route = {"method": "GET", "route": "/api/v1/subdomains/{subdomain_id}"}
+    before = _sample("http_request_duration_seconds_count", status="404", **route)
+    selects = _sample("db_query_duration_seconds_count", statement="SELECT")
+
+    for subdomain_id in (1, 2):
+        client.get(f"/api/v1/subdomains/{subdomain_id}", headers=auth_headers)
+
+    after = _sample("http_request_duration_seconds_count", status="404", **route)
+    assert after - before == 2
+    assert _sample("db_query_duration_seconds_count", statement="SELECT") > selects
+
+
+def test_dependency_latency_is_recorded(fake_netlify):
+    async def run():
+        async with AsyncNetlify("token", base_url=fake_netlify.base_url) as netlify:
+            await netlify.get_dns_zones()
+
+    calls = _sample(
+        "netlify_request_duration_seconds_count", method="GET", status="200"
+    )
+    checks = _sample("profanity_check_duration_seconds_count")
+
+    asyncio.run(run())
+    is_profanity_found("hello")
+
+    assert (
+        _sample("netlify_request_duration_seconds_count", method="GET", status="200")
+        == calls + 1
+    )
+    assert _sample("profanity_check_duration_seconds_count") == checks + 1
+
+
+def test_metrics_endpoint_exports_app_stats(db):
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'cache_hits_total{cache="token"}' in response.text
+    assert "db_pool_checkouts_total" in response.text
+    assert "http_request_duration_seconds_bucket" in response.text
+
+
+def test_metrics_can_be_configured_again(db):
+    # Another app in the same process, as test suites and reloaders build
+    configure_metrics(FastAPI())
+    selects = _sample("db_query_duration_seconds_count", statement="SELECT")
+
+    async def run():
+        async with AsyncSessionLocal() as session:
+            await session.execute(text("SELECT 1"))
+
+    asyncio.run(run())
+
+    assert _sample("db_query_duration_seconds_count", statement="SELECT") == (
+        selects + 1
+    )
+    assert client.get("/metrics").text.count('cache_hits_total{cache="token"}') == 1
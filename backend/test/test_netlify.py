@@ -0,0 +1,335 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from get_fosscu_domain.models.subdomain import Subdomain
+from get_fosscu_domain.utils.netlify import (AsyncNetlify, CircuitBreaker,
+                                             CircuitOpenError, DnsRecordIndex,
+                                             RetryPolicy)
+
+
+def test_async_netlify_requests_overlap(fake_netlify):
+    fake_netlify.latency = 0.2
+
+    async def run():
+        async with AsyncNetlify("token", base_url=fake_netlify.base_url) as netlify:
+            start = time.perf_counter()
+            zones = await asyncio.gather(*(netlify.get_dns_zones() for _ in range(10)))
+            return time.perf_counter() - start, zones
+
+    elapsed, zones = asyncio.run(run())
+
+    assert all(z[0]["id"] == fake_netlify.zone_id for z in zones)
+    # Ten sequential calls would take two seconds
+    assert elapsed < 1.0
+    assert fake_netlify.max_in_flight > 1
+
+
+def test_async_netlify_record_lifecycle(fake_netlify):
+    async def run():
+        async with AsyncNetlify("token", base_url=fake_netlify.base_url) as netlify:
+            zone_id = await netlify.get_zone_id_by_domain("fosscu.org")
+            record = await netlify.create_dns_record(
+                zone_id, "cname", "demo.fosscu.org", "demo.netlify.app"
+            )
+            found = await netlify.get_record_id_by_subdomain(zone_id, "demo.fosscu.org")
+            removed = await netlify.remove_dns_record(zone_id, record["id"])
+            return record, found, removed
+
+    record, found, removed = asyncio.run(run())
+
+    assert record["type"] == "CNAME"
+    assert found == record["id"]
+    assert removed is True
+    assert fake_netlify.records == {}
+
+
+def test_create_subdomain_defers_dns_writes(api, fake_netlify, db, drain_outbox):
+    fake_netlify.latency = 0.1
+    payloads = [{"subdomain": f"site{i}", "target_domain": "x.app"} for i in range(4)]
+
+    responses = api.gather("POST", "/api/v1/subdomains/", payloads)
+
+    assert [r.status_code for r in responses] == [202] * 4
+    assert fake_netlify.calls == []
+
+    drain_outbox()
+
+    assert len(fake_netlify.records) == 4
+    assert fake_netlify.max_in_flight > 1
+
+
+def test_zone_id_is_cached_until_netlify_returns_404(fake_netlify):
+    async def run():
+        async with AsyncNetlify("token", base_url=fake_netlify.base_url) as netlify:
+            for _ in range(3):
+                zone_id = await netlify.get_zone_id_by_domain("fosscu.org")
+            assert zone_id == fake_netlify.zone_id
+            assert netlify.zone_cache.stats() == {"hits": 2, "misses": 1, "size": 1}
+
+            # The zone is recreated under a new ID
+            fake_netlify.zone_id = "zone-2"
+            with pytest.raises(httpx.HTTPStatusError):
+                await netlify.get_record_id_by_subdomain(zone_id, "demo.fosscu.org")
+            return await netlify.get_zone_id_by_domain("fosscu.org")
+
+    assert asyncio.run(run()) == "zone-2"
+    assert fake_netlify.calls.count("GET /api/v1/dns_zones") == 2
+
+
+def test_record_404_keeps_the_zone_cached(fake_netlify):
+    kept = fake_netlify.add_record("kept.fosscu.org", "kept.netlify.app")
+    gone = fake_netlify.add_record("gone.fosscu.org", "gone.netlify.app")
+
+    async def run():
+        async with AsyncNetlify("token", base_url=fake_netlify.base_url) as netlify:
+            zone_id = await netlify.get_zone_id_by_domain("fosscu.org")
+            await netlify.get_dns_records(zone_id)
+            # Removed behind the client's back
+            del fake_netlify.records[gone["id"]]
+            with pytest.raises(httpx.HTTPStatusError):
+                await netlify.remove_dns_record(zone_id, gone["id"])
+            return (
+                netlify.zone_cache.peek("fosscu.org"),
+                await netlify.get_record_id_by_subdomain(zone_id, "kept.fosscu.org"),
+                await netlify.get_record_id_by_subdomain(zone_id, "gone.fosscu.org"),
+            )
+
+    assert asyncio.run(run()) == (fake_netlify.zone_id, kept["id"], None)
+    assert fake_netlify.calls.count("GET /api/v1/dns_zones") == 1
+    assert fake_netlify.calls.count("GET /api/v1/dns_zones/zone-1/dns_records") == 1
+
+
+def test_record_lookups_are_served_from_the_index(fake_netlify):
+    existing = fake_netlify.add_record("old.fosscu.org", "old.netlify.app")
+
+    async def run():
+        async with AsyncNetlify("token", base_url=fake_netlify.base_url) as netlify:
+            zone_id = await netlify.get_zone_id_by_domain("fosscu.org")
+            assert (
+                await netlify.get_record_id_by_subdomain(zone_id, "old.fosscu.org")
+                == existing["id"]
+            )
+
+            created = await netlify.create_dns_record(
+                zone_id, "CNAME", "new.fosscu.org", "new.netlify.app"
+            )
+            await netlify.remove_dns_record(zone_id, existing["id"])
+
+            new_id = await netlify.get_record_id_by_subdomain(
+                zone_id, "NEW.fosscu.org."
+            )
+            old_id = await netlify.get_record_id_by_subdomain(zone_id, "old.fosscu.org")
+            return created["id"], new_id, old_id
+
+    created_id, new_id, old_id = asyncio.run(run())
+
+    assert new_id == created_id
+    assert old_id is None
+    # The zone was listed once; every later lookup hit the index
+    assert fake_netlify.calls.count("GET /api/v1/dns_zones/zone-1/dns_records") == 1
+
+
+def test_record_index_keeps_every_record_of_a_hostname():
+    index = DnsRecordIndex()
+    mx = {"id": "1", "hostname": "mail.fosscu.org", "type": "MX", "value": "mx"}
+    txt = {"id": "2", "hostname": "mail.fosscu.org", "type": "TXT", "value": "spf"}
+    index.load("zone-1", [mx, txt])
+
+    assert index.get("zone-1", "mail.fosscu.org", "TXT") == txt
+    assert index.get("zone-1", "mail.fosscu.org", "CNAME") is None
+    index.discard("zone-1", "1")
+    assert index.get("zone-1", "mail.fosscu.org") == txt
+    index.put("zone-1", {**txt, "type": "CNAME"})
+    assert index.get("zone-1", "mail.fosscu.org", "TXT") is None
+    assert len(index) == 1
+
+
+def _retrying_client(fake_netlify, **kwargs):
+    return AsyncNetlify(
+        "token",
+        base_url=fake_netlify.base_url,
+        retry=RetryPolicy(max_retries=3, backoff=0.01),
+        **kwargs,
+    )
+
+
+def test_idempotent_calls_retry_server_errors(fake_netlify):
+    fake_netlify.fail_next(503, times=2)
+
+    async def run():
+        async with _retrying_client(fake_netlify) as netlify:
+            return await netlify.get_dns_zones(), netlify.metrics.stats()
+
+    zones, stats = asyncio.run(run())
+
+    assert zones[0]["id"] == fake_netlify.zone_id
+    assert stats["retries"] == 2
+    assert stats["requests"] == 3
+
+
+def test_post_is_not_retried_after_server_error(fake_netlify):
+    fake_netlify.fail_next(503)
+
+    async def run():
+        async with _retrying_client(fake_netlify) as netlify:
+            await netlify.create_dns_record(
+                "zone-1", "CNAME", "demo.fosscu.org", "demo.netlify.app"
+            )
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(run())
+    assert fake_netlify.calls == ["POST /api/v1/dns_zones/zone-1/dns_records"]
+    assert fake_netlify.records == {}
+
+
+def test_post_is_retried_after_429(fake_netlify):
+    fake_netlify.fail_next(429, headers={"Retry-After": "0"})
+
+    async def run():
+        async with _retrying_client(fake_netlify) as netlify:
+            record = await netlify.create_dns_record(
+                "zone-1", "CNAME", "demo.fosscu.org", "demo.netlify.app"
+            )
+            return record, netlify.metrics.stats()
+
+    record, stats = asyncio.run(run())
+
+    assert record["hostname"] == "demo.fosscu.org"
+    assert len(fake_netlify.records) == 1
+    assert stats["rate_limited"] == 1
+    assert stats["retries"] == 1
+
+
+def test_retry_after_beyond_max_delay_gives_up():
+    policy = RetryPolicy(max_retries=3, max_delay=5.0)
+    request = httpx.Request("GET", "https://api.netlify.com/api/v1/dns_zones")
+
+    soon = httpx.Response(429, headers={"Retry-After": "2"}, request=request)
+    late = httpx.Response(429, headers={"Retry-After": "60"}, request=request)
+
+    assert policy.delay("GET", 0, response=soon) == 2.0
+    assert policy.delay("GET", 0, response=late) is None
+    assert policy.delay("GET", 3, response=soon) is None
+
+
+def test_token_bucket_spaces_out_bursts(fake_netlify):
+    async def run():
+        async with _retrying_client(
+            fake_netlify, requests_per_minute=600, burst=2
+        ) as netlify:
+            start = time.perf_counter()
+            await asyncio.gather(*(netlify.get_dns_zones() for _ in range(4)))
+            return time.perf_counter() - start, netlify.metrics.stats()
+
+    elapsed, stats = asyncio.run(run())
+
+    # Two requests go out at once, the other two wait 0.1s and 0.2s
+    assert elapsed >= 0.2
+    assert stats["throttled"] == 2
+
+
+def test_update_subdomain_reports_netlify_outage(api, fake_netlify, user, db):
+    subdomain = Subdomain(
+        subdomain="demo",
+        target_domain="x.app",
+        record_type="CNAME",
+        ttl=3600,
+        user_id=user.id,
+    )
+    db.add(subdomain)
+    db.commit()
+    fake_netlify.fail_next(503, method="POST", headers={"Retry-After": "0"})
+
+    response = api.run(
+        lambda client: client.put(
+            f"/api/v1/subdomains/{subdomain.id}",
+            json={"subdomain": "demo", "target_domain": "y.app"},
+        ),
+        netlify=lambda: _retrying_client(fake_netlify),
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "0"
+    assert fake_netlify.records == {}
+
+
+def test_circuit_breaker_opens_and_probes_closed():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.before_call()
+    # Only one probe is admitted while half-open
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_success(elapsed=0.01)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats()["times_opened"] == 2
+
+
+def test_slow_calls_trip_the_breaker(fake_netlify):
+    fake_netlify.latency = 0.1
+    breaker = CircuitBreaker(failure_threshold=1, slow_call_threshold=0.05)
+
+    async def run():
+        async with _retrying_client(fake_netlify, breaker=breaker) as netlify:
+            await netlify.get_dns_zones()
+            await netlify.get_dns_zones()
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(run())
+    assert len(fake_netlify.calls) == 1
+
+
+def test_zone_lookup_does_not_hide_an_open_breaker(fake_netlify):
+    fake_netlify.fail_next(404)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+
+    async def run():
+        async with _retrying_client(fake_netlify, breaker=breaker) as netlify:
+            # An error answer is a missing zone, a rejected call is not
+            assert await netlify.get_zone_id_by_domain("fosscu.org") is None
+            breaker.before_call()
+            breaker.record_failure()
+            await netlify.get_zone_id_by_domain("fosscu.org")
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(run())
+    assert len(fake_netlify.calls) == 1
+
+
+def test_open_breaker_fails_writes_fast(api, fake_netlify, db):
+    fake_netlify.fail_next(503, times=2)
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+    async def send(client):
+        with pytest.raises(CircuitOpenError):
+            await api.netlify.get_dns_zones()
+        deleted = await client.delete("/api/v1/subdomains/1")
+        health = await client.get("/api/v1/healthz")
+        return deleted, health
+
+    deleted, health = api.run(
+        send, netlify=lambda: _retrying_client(fake_netlify, breaker=breaker)
+    )
+
+    assert deleted.status_code == 503
+    assert int(deleted.headers["Retry-After"]) > 0
+    assert len(fake_netlify.calls) == 2
+    assert health.json()["netlify"]["breaker"]["state"] == "open"
@@ -0,0 +1,121 @@
+import asyncio
+from datetime import datetime
+
+from get_fosscu_domain.models.dns_operation import DnsOperation
+from get_fosscu_domain.models.subdomain import Subdomain
+from get_fosscu_domain.postgres import AsyncSessionLocal
+from get_fosscu_domain.subdomain.outbox import (OperationRejected,
+                                                OutboxWorker, create_operation)
+from get_fosscu_domain.utils.netlify import AsyncNetlify
+
+
+def _enqueue(db, user, name="demo"):
+    subdomain = Subdomain(
+        subdomain=name,
+        target_domain="x.app",
+        record_type="CNAME",
+        ttl=3600,
+        user_id=user.id,
+    )
+    db.add(subdomain)
+    db.commit()
+    operation = create_operation(subdomain, "fosscu.org")
+    db.add(operation)
+    db.commit()
+    return subdomain, operation
+
+
+def _refresh(db, operation):
+    db.expire_all()
+    return db.get(DnsOperation, operation.id)
+
+
+def _posts(fake_netlify):
+    return [c for c in fake_netlify.calls if c.startswith("POST")]
+
+
+def test_failed_attempt_is_retried(fake_netlify, user, db, drain_outbox):
+    _, operation = _enqueue(db, user)
+    fake_netlify.fail_next(503, method="POST")
+
+    drain_outbox(retry_backoff=0)
+
+    operation = _refresh(db, operation)
+    assert operation.status == DnsOperation.DONE
+    assert operation.attempts == 2
+    assert len(_posts(fake_netlify)) == 2
+    assert len(fake_netlify.records) == 1
+
+
+def test_record_left_by_an_earlier_attempt_is_not_duplicated(
+    fake_netlify, user, db, drain_outbox
+):
+    _, operation = _enqueue(db, user)
+    fake_netlify.add_record("demo.fosscu.org", "x.app")
+
+    drain_outbox()
+
+    assert _refresh(db, operation).status == DnsOperation.DONE
+    assert _posts(fake_netlify) == []
+
+
+def test_exhausted_attempts_release_the_name(fake_netlify, user, db, drain_outbox):
+    _, operation = _enqueue(db, user)
+    fake_netlify.fail_next(503, times=2, method="POST")
+
+    drain_outbox(retry_backoff=0, max_attempts=2)
+
+    operation = _refresh(db, operation)
+    assert operation.status == DnsOperation.FAILED
+    assert "503" in operation.last_error
+    assert db.query(Subdomain).count() == 0
+
+
+def test_deleted_subdomain_cancels_its_operation(fake_netlify, user, db, drain_outbox):
+    subdomain, operation = _enqueue(db, user)
+    db.delete(subdomain)
+    db.commit()
+
+    drain_outbox()
+
+    assert _refresh(db, operation).status == DnsOperation.CANCELLED
+    assert fake_netlify.calls == []
+
+
+def test_operation_is_leased_to_one_worker(fake_netlify, user, db):
+    _enqueue(db, user)
+
+    async def run():
+        async with AsyncNetlify("token", base_url=fake_netlify.base_url) as netlify:
+            workers = [
+                OutboxWorker(AsyncSessionLocal, netlify, "fosscu.org") for _ in range(2)
+            ]
+            return await asyncio.gather(*(w.process_due() for w in workers))
+
+    assert sorted(asyncio.run(run())) == [0, 1]
+    assert len(_posts(fake_netlify)) == 1
+
+
+def test_worker_that_lost_its_lease_does_not_finish(fake_netlify, user, db):
+    _, operation = _enqueue(db, user)
+
+    class SlowWorker(OutboxWorker):
+        async def _apply(self, operation):
+            # Another worker took the operation over after the lease ran out
+            async with self.session_factory() as other:
+                taken = await other.get(DnsOperation, operation.id)
+                taken.next_attempt_at = datetime.utcnow()
+                await other.commit()
+            raise OperationRejected("Subdomain already exists in Netlify DNS")
+
+    async def run():
+        async with AsyncNetlify("token", base_url=fake_netlify.base_url) as netlify:
+            return await SlowWorker(
+                AsyncSessionLocal, netlify, "fosscu.org"
+            ).process_due()
+
+    assert asyncio.run(run()) == 1
+    operation = _refresh(db, operation)
+    assert operation.status == DnsOperation.IN_FLIGHT
+    assert operation.last_error is None
+    assert db.query(Subdomain).count() == 1
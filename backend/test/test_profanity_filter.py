@@ -0,0 +1,50 @@
+import re
+
+import pytest
+
+from get_fosscu_domain.utils.profanity_filter import BAD_WORD_LIST, is_profanity_found
+
+
+@pytest.mark.parametrize("label", ["ass", "my-ass", "Fuck-this", "i-love-porn"])
+def test_flags_profanity(label):
+    assert is_profanity_found(label)
+
+
+@pytest.mark.parametrize(
+    "label",
+    [
+        "class",
+        "assets",
+        "scraping",
+        "basement",
+        "essex",
+        "small",
+        "web-app",
+        "trimming",
+        "brimming",
+        "scrimming",
+        "thumping",
+        "chumping",
+        "hot-chicken",
+        "cummings",
+        "how-to-kill-bugs",
+        "hardcoresoftware",
+    ],
+)
+def test_allows_innocent_labels(label):
+    assert not is_profanity_found(label)
+
+
+@pytest.mark.parametrize("entry", BAD_WORD_LIST)
+def test_matches_the_split_and_compare_check(entry):
+    def reference(text):
+        return not set(re.split(r"\W+", text.lower())).isdisjoint(BAD_WORD_LIST)
+
+    for label in (
+        entry,
+        entry.replace(" ", "-"),
+        f"my-{entry}-site",
+        f"x{entry}",
+        f"{entry}1",
+    ):
+        assert is_profanity_found(label) == reference(label), label
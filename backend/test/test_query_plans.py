@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from get_fosscu_domain.models.subdomain import Subdomain
+from get_fosscu_domain.postgres import engine
+from get_fosscu_domain.subdomain.availability import taken_names_query
+from get_fosscu_domain.subdomain.listing import (LISTABLE_FIELDS,
+                                                 encode_cursor, keyset_query)
+from sqlalchemy import func, select
+
+
+def _plan(statement):
+    compiled = statement.compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").all()
+    return "\n".join(row[-1] for row in rows)
+
+
+def test_user_listing_uses_the_user_index(db):
+    query = keyset_query(list(LISTABLE_FIELDS), encode_cursor(datetime(2024, 1, 1), 7))
+    plan = _plan(query.where(Subdomain.user_id == "u1").limit(51))
+
+    assert "ix_subdomains_user_id_created_at" in plan
+    # Rows come out of the index in page order
+    assert "TEMP B-TREE" not in plan
+
+
+def test_user_quota_count_uses_the_user_index(db):
+    plan = _plan(select(func.count(Subdomain.id)).where(Subdomain.user_id == "u1"))
+
+    assert "ix_subdomains_user_id_created_at" in plan
+
+
+def test_taken_name_lookup_uses_the_name_index(db):
+    plan = _plan(taken_names_query(["demo", "Other"]))
+
+    assert "ix_subdomains_lower_subdomain" in plan
+    # The rename check excludes the row being renamed
+    plan = _plan(taken_names_query(["demo"]).where(Subdomain.id != 7))
+
+    assert "ix_subdomains_lower_subdomain" in plan
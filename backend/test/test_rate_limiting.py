@@ -0,0 +1,71 @@
+from get_fosscu_domain.auth.auth import create_access_token
+from get_fosscu_domain.config import get_settings
+from get_fosscu_domain.models.subdomain import Subdomain
+from get_fosscu_domain.models.user import User
+from get_fosscu_domain.rate_limiting import DNS_COST_CREATE, get_rate_limit_key
+from starlette.requests import Request
+
+
+def _request(headers):
+    return Request(
+        {
+            "type": "http",
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+            "client": ("10.0.0.1", 1234),
+        }
+    )
+
+
+def test_key_uses_user_then_falls_back_to_ip(auth_headers):
+    assert get_rate_limit_key(_request(auth_headers)) == "user:1"
+    assert get_rate_limit_key(_request({})) == "ip:10.0.0.1"
+    assert get_rate_limit_key(_request({"Authorization": "Bearer junk"})) == (
+        "ip:10.0.0.1"
+    )
+
+
+def test_dns_budget_is_per_user(api, fake_netlify, db):
+    db.add(User(github_id=2, username="hubot", avatar_url="https://x/b.png"))
+    db.commit()
+    other_headers = {"Authorization": f"Bearer {create_access_token({'sub': '2'})}"}
+
+    # Deleting a missing subdomain 404s before touching Netlify
+    async def send(client):
+        responses = []
+        while not responses or responses[-1].status_code != 429:
+            responses.append(await client.delete("/api/v1/subdomains/999"))
+        other = await client.delete("/api/v1/subdomains/999", headers=other_headers)
+        return responses, other
+
+    responses, other = api.run(send)
+
+    budget = int(get_settings().RATE_LIMIT_DNS.split("/")[0])
+    assert len(responses) == budget + 1
+    assert responses[0].status_code == 404
+    assert responses[-1].headers["X-RateLimit-Limit"] == str(budget)
+    assert int(responses[-1].headers["Retry-After"]) > 0
+    assert responses[-1].headers["X-RateLimit-Remaining"] == "0"
+    assert other.status_code == 404
+    assert fake_netlify.calls == []
+
+
+def test_batches_are_charged_per_item(api, db):
+    budget = int(get_settings().RATE_LIMIT_DNS.split("/")[0])
+
+    def batch(prefix, size):
+        return {
+            "subdomains": [
+                {"subdomain": f"{prefix}{i}", "target_domain": "x.app"}
+                for i in range(size)
+            ]
+        }
+
+    small, too_big = [
+        api.request("POST", "/api/v1/subdomains/batch", json=b)
+        for b in (batch("small", 3), batch("big", budget))
+    ]
+
+    assert small.status_code == 202
+    assert small.headers["X-RateLimit-Remaining"] == str(budget - 3 * DNS_COST_CREATE)
+    assert too_big.status_code == 429
+    assert db.query(Subdomain).count() == 3
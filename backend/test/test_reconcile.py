@@ -0,0 +1,85 @@
+import asyncio
+
+from get_fosscu_domain.models.dns_operation import DnsOperation
+from get_fosscu_domain.models.subdomain import Subdomain
+from get_fosscu_domain.postgres import AsyncSessionLocal
+from get_fosscu_domain.subdomain.outbox import create_operation
+from get_fosscu_domain.subdomain.reconcile import (MISMATCH, MISSING, ORPHAN,
+                                                   reconcile)
+from get_fosscu_domain.utils.netlify import AsyncNetlify
+
+
+def _seed(fake_netlify, user, db):
+    rows = {}
+    for name, target in [
+        ("alpha", "alpha.app"),
+        ("beta", "beta.app"),
+        ("gamma", "gamma.app"),
+        ("a-b", "ab.app"),
+        ("ab", "ab2.app"),
+        ("queued", "queued.app"),
+    ]:
+        rows[name] = Subdomain(
+            subdomain=name,
+            target_domain=target,
+            record_type="CNAME",
+            ttl=3600,
+            user_id=user.id,
+        )
+        db.add(rows[name])
+    db.commit()
+    db.add(create_operation(rows["queued"], "fosscu.org"))
+    db.commit()
+
+    fake_netlify.add_record("alpha.fosscu.org", "alpha.app.")
+    fake_netlify.add_record("gamma.fosscu.org", "elsewhere.app")
+    fake_netlify.add_record("a-b.fosscu.org", "ab.app")
+    fake_netlify.add_record("ab.fosscu.org", "ab2.app")
+    fake_netlify.add_record("stray.fosscu.org", "stray.app")
+    # Not under the managed one-label namespace
+    fake_netlify.add_record("fosscu.org", "75.2.60.5", record_type="A")
+    fake_netlify.add_record("www.docs.fosscu.org", "docs.app")
+
+
+def _reconcile(fake_netlify, **options):
+    found = []
+
+    async def run():
+        async with AsyncNetlify("token", base_url=fake_netlify.base_url) as netlify:
+            return await reconcile(
+                AsyncSessionLocal,
+                netlify,
+                "fosscu.org",
+                on_drift=found.append,
+                **options,
+            )
+
+    report = asyncio.run(run())
+    return report, sorted((d.kind, d.name) for d in found)
+
+
+def test_reconcile_reports_drift(fake_netlify, user, db):
+    _seed(fake_netlify, user, db)
+
+    report, found = _reconcile(fake_netlify)
+
+    assert found == [(MISMATCH, "gamma"), (MISSING, "beta"), (ORPHAN, "stray")]
+    assert report.rows == 6
+    assert report.repaired == 0
+    assert len(fake_netlify.records) == 7
+
+
+def test_reconcile_repairs_drift(fake_netlify, user, db):
+    _seed(fake_netlify, user, db)
+
+    report, _ = _reconcile(fake_netlify, repair=True, delete_orphans=True)
+
+    assert report.repaired == 3
+    values = {r["hostname"]: r["value"] for r in fake_netlify.records.values()}
+    assert values["gamma.fosscu.org"] == "gamma.app"
+    assert "stray.fosscu.org" not in values
+    queued = db.query(DnsOperation.hostname).filter_by(status=DnsOperation.PENDING)
+    assert sorted(h for (h,) in queued) == ["beta.fosscu.org", "queued.fosscu.org"]
+
+    _, found = _reconcile(fake_netlify)
+    assert found == []
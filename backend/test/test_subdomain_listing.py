@@ -0,0 +1,76 @@
+import json
+from datetime import datetime, timedelta
+
+from get_fosscu_domain.config import get_settings
+from get_fosscu_domain.models.subdomain import Subdomain
+from get_fosscu_domain.models.user import User
+
+
+def _seed(db, user, count, start=0):
+    created = datetime(2024, 1, 1)
+    for i in range(start, start + count):
+        db.add(
+            Subdomain(
+                subdomain=f"site{i:03d}",
+                target_domain="x.app",
+                record_type="CNAME",
+                ttl=3600,
+                user_id=user.id,
+                # Pairs share a timestamp so the id breaks the tie
+                created_at=created + timedelta(minutes=i // 2),
+            )
+        )
+    db.commit()
+
+
+def test_listing_walks_pages_with_a_cursor(api, user, db):
+    _seed(db, user, 7)
+
+    names, url, pages = [], "/api/v1/subdomains/?limit=3", 0
+    while url:
+        response = api.request("GET", url)
+        assert response.status_code == 200
+        names += [row["subdomain"] for row in response.json()]
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        url = f"/api/v1/subdomains/?limit=3&after={cursor}" if cursor else None
+
+    assert pages == 3
+    assert names == [f"site{i:03d}" for i in range(7)]
+
+
+def test_listing_returns_only_selected_fields(api, user, db):
+    _seed(db, user, 2)
+
+    response = api.request("GET", "/api/v1/subdomains/?fields=subdomain,ttl")
+    assert response.json() == [
+        {"subdomain": "site000", "ttl": 3600},
+        {"subdomain": "site001", "ttl": 3600},
+    ]
+
+    response = api.request("GET", "/api/v1/subdomains/?fields=user_id")
+    assert response.status_code == 400
+    assert api.request("GET", "/api/v1/subdomains/?after=nope").status_code == 400
+
+
+def test_admin_export_streams_every_user(api, user, db, monkeypatch):
+    other = User(github_id=2, username="hubot", avatar_url="https://x/b.png")
+    db.add(other)
+    db.commit()
+    _seed(db, user, 2)
+    _seed(db, other, 2, start=2)
+
+    assert api.request("GET", "/api/v1/subdomains/all").status_code == 403
+
+    monkeypatch.setattr(get_settings(), "ADMIN_GITHUB_IDS", [user.github_id])
+    response = api.request("GET", "/api/v1/subdomains/all?fields=subdomain,user_id")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows == [
+        {"subdomain": "site000", "user_id": user.id},
+        {"subdomain": "site001", "user_id": user.id},
+        {"subdomain": "site002", "user_id": other.id},
+        {"subdomain": "site003", "user_id": other.id},
+    ]
@@ -0,0 +1,212 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from get_fosscu_domain.config import get_settings
+from get_fosscu_domain.models.dns_operation import DnsOperation
+from get_fosscu_domain.models.subdomain import Subdomain
+from get_fosscu_domain.postgres import AsyncSessionLocal
+from get_fosscu_domain.subdomain.availability import name_index
+from get_fosscu_domain.utils.netlify import warm_up
+
+
+def test_create_subdomain_enforces_quota(api, db):
+    payloads = [{"subdomain": f"site{i}", "target_domain": "x.app"} for i in range(6)]
+    responses = [api.request("POST", "/api/v1/subdomains/", json=p) for p in payloads]
+
+    assert [r.status_code for r in responses] == [202] * 5 + [400]
+    assert responses[-1].json()["detail"] == "Maximum limit of 5 domains reached"
+    assert responses[0].json()["hostname"] == "site0.fosscu.org"
+    assert db.query(Subdomain).count() == 5
+
+
+def test_admins_have_the_same_quota(api, user, db, monkeypatch):
+    monkeypatch.setattr(get_settings(), "ADMIN_GITHUB_IDS", [user.github_id])
+    payloads = [{"subdomain": f"site{i}", "target_domain": "x.app"} for i in range(6)]
+
+    responses = api.gather("POST", "/api/v1/subdomains/", payloads)
+
+    assert sorted(r.status_code for r in responses) == [202] * 5 + [400]
+
+
+def test_racing_creates_reach_netlify_once(api, fake_netlify, db, drain_outbox):
+    payload = {"subdomain": "taken", "target_domain": "x.app"}
+
+    responses = api.gather("POST", "/api/v1/subdomains/", [payload] * 3)
+    drain_outbox()
+
+    assert sorted(r.status_code for r in responses) == [202, 400, 400]
+    assert [c for c in fake_netlify.calls if c.startswith("POST")] == [
+        "POST /api/v1/dns_zones/zone-1/dns_records"
+    ]
+    assert db.query(Subdomain).count() == 1
+
+
+def test_failed_dns_write_releases_the_name(api, fake_netlify, db, drain_outbox):
+    fake_netlify.add_record("clash.fosscu.org", "elsewhere.app")
+    payload = {"subdomain": "clash", "target_domain": "x.app"}
+
+    response = api.request("POST", "/api/v1/subdomains/", json=payload)
+    location = response.headers["Location"]
+    assert response.status_code == 202
+    assert api.request("GET", location).json()["status"] == "pending"
+
+    drain_outbox()
+
+    operation = api.request("GET", location).json()
+    assert operation["status"] == "failed"
+    assert operation["last_error"] == "Subdomain already exists in Netlify DNS"
+    assert operation["subdomain_id"] is None
+    assert db.query(Subdomain).count() == 0
+    assert len(fake_netlify.records) == 1
+
+
+def test_inline_changes_wait_for_an_operation_in_flight(
+    api, fake_netlify, db, drain_outbox
+):
+    payload = {"subdomain": "busy", "target_domain": "x.app"}
+    response = api.request("POST", "/api/v1/subdomains/", json=payload)
+    url = f"/api/v1/subdomains/{response.json()['subdomain_id']}"
+    operation = db.get(DnsOperation, response.json()["id"])
+    # As leased by a worker that is writing the record right now
+    operation.status = DnsOperation.IN_FLIGHT
+    operation.next_attempt_at = datetime.utcnow() + timedelta(minutes=1)
+    db.commit()
+
+    updated = api.request("PUT", url, json=payload)
+    deleted = api.request("DELETE", url)
+
+    assert [updated.status_code, deleted.status_code] == [409, 409]
+    assert db.query(Subdomain).count() == 1
+    assert fake_netlify.records == {}
+
+    # A lease that ran out is picked up again
+    operation.next_attempt_at = datetime.utcnow()
+    db.commit()
+    drain_outbox()
+    db.expire_all()
+    assert operation.status == DnsOperation.DONE
+    assert len(fake_netlify.records) == 1
+
+    assert api.request("DELETE", url).status_code == 204
+    assert fake_netlify.records == {}
+
+
+def test_failed_inline_write_requeues_the_create(api, fake_netlify, db, drain_outbox):
+    payload = {"subdomain": "flaky", "target_domain": "x.app"}
+    response = api.request("POST", "/api/v1/subdomains/", json=payload)
+    url = f"/api/v1/subdomains/{response.json()['subdomain_id']}"
+    # The update cancels the queued create, then fails to write the record
+    fake_netlify.fail_next(503, method="POST")
+
+    updated = api.request("PUT", url, json={**payload, "ttl": 600})
+
+    assert updated.status_code == 503
+    operation = db.get(DnsOperation, response.json()["id"])
+    assert operation.status == DnsOperation.PENDING
+    drain_outbox()
+    db.expire_all()
+    assert operation.status == DnsOperation.DONE
+    (record,) = fake_netlify.records.values()
+    assert record["ttl"] == 3600
+    assert db.get(Subdomain, operation.subdomain_id).ttl == 3600
+
+
+def _batch(api, path, payload):
+    async def send(client):
+        await warm_up(api.netlify, ["fosscu.org"])
+        return await client.post(path, json=payload)
+
+    return api.run(send)
+
+
+def test_batch_create_reports_each_item(api, fake_netlify, db, drain_outbox):
+    fake_netlify.add_record("indns.fosscu.org", "elsewhere.app")
+    names = ["one", "two", "one", "my-ass", "indns", "three", "four", "five", "six"]
+    payload = {
+        "subdomains": [{"subdomain": n, "target_domain": "x.app"} for n in names]
+    }
+
+    response = _batch(api, "/api/v1/subdomains/batch", payload)
+
+    assert response.status_code == 202
+    body = response.json()
+    details = {r["subdomain"]: r["detail"] for r in body["results"] if not r["success"]}
+    assert details == {
+        "one": "Duplicate subdomain in batch",
+        "my-ass": "Subdomain contains inappropriate content",
+        "indns": "Subdomain already exists in Netlify DNS",
+        "six": "Maximum limit of 5 domains reached",
+    }
+    assert body["succeeded"] == 5
+    assert db.query(Subdomain).count() == 5
+    # One listing of the zone served every Netlify existence check, and the
+    # records are left to the outbox
+    assert fake_netlify.calls.count("GET /api/v1/dns_zones/zone-1/dns_records") == 1
+    assert not [c for c in fake_netlify.calls if c.startswith("POST")]
+    assert db.query(DnsOperation).count() == 5
+    assert all(r["operation_id"] for r in body["results"] if r["success"])
+
+    drain_outbox()
+    assert len(fake_netlify.records) == 6
+
+
+def test_concurrent_batches_share_the_quota(api, db):
+    # SQLite serializes the two writers on its database lock, so this only
+    # covers the SQLite path; on Postgres the claims rely on the row lock
+    # taken by _lock_quota, which this suite cannot exercise
+    batches = [
+        {
+            "subdomains": [
+                {"subdomain": f"{p}{i}", "target_domain": "x.app"} for i in range(4)
+            ]
+        }
+        for p in ("left", "right")
+    ]
+
+    responses = api.gather("POST", "/api/v1/subdomains/batch", batches)
+
+    assert sum(r.json()["succeeded"] for r in responses) == 5
+    assert db.query(Subdomain).count() == 5
+
+
+def test_batch_delete(api, fake_netlify, db, drain_outbox):
+    payload = {
+        "subdomains": [
+            {"subdomain": n, "target_domain": "x.app"} for n in ["aaa", "bbb"]
+        ]
+    }
+    created = _batch(api, "/api/v1/subdomains/batch", payload)
+    ids = [r["id"] for r in created.json()["results"]]
+    drain_outbox()
+    assert len(fake_netlify.records) == 2
+
+    response = _batch(api, "/api/v1/subdomains/batch/delete", {"ids": ids + [999]})
+
+    assert [(r["id"], r["success"]) for r in response.json()["results"]] == [
+        (ids[0], True),
+        (ids[1], True),
+        (999, False),
+    ]
+    assert db.query(Subdomain).count() == 0
+    assert fake_netlify.records == {}
+
+
+def test_availability_is_answered_from_memory(api, fake_netlify, db):
+    asyncio.run(name_index.load(AsyncSessionLocal))
+    payload = {"subdomain": "mine", "target_domain": "x.app"}
+    api.request("POST", "/api/v1/subdomains/", json=payload)
+    fake_netlify.calls.clear()
+
+    def check(name):
+        return api.run(
+            lambda client: client.get(
+                "/api/v1/subdomains/available", params={"name": name}
+            ),
+            headers={},
+        ).json()
+
+    assert check("free")["available"] is True
+    assert check("MINE")["reason"] == "Subdomain is already taken"
+    assert check("my-ass")["available"] is False
+    assert check("a_b")["available"] is False
+    assert fake_netlify.calls == []
@@ -0,0 +1,131 @@
+import json
+
+import pytest
+from get_fosscu_domain import tracing
+from get_fosscu_domain.app import app
+from get_fosscu_domain.config import get_settings
+from get_fosscu_domain.models.subdomain import Subdomain
+from get_fosscu_domain.postgres import async_engine
+from get_fosscu_domain.tracing import (TracingMiddleware, init_tracing,
+                                       trace_engine)
+from sqlalchemy import create_engine, text
+
+trace_engine(async_engine.sync_engine)
+
+
+@pytest.fixture
+def traces(tmp_path):
+    """Trace into a file for the test, return a reader for the spans"""
+    path = tmp_path / "traces.jsonl"
+    providers = []
+
+    def start(sample_ratio=1.0):
+        settings = get_settings().model_copy(
+            update={
+                "TRACING_EXPORTER": "file",
+                "TRACING_FILE_PATH": str(path),
+                "TRACING_SAMPLE_RATIO": sample_ratio,
+            }
+        )
+        providers.append(init_tracing(settings))
+
+    def spans():
+        providers[-1].force_flush()
+        if not path.exists():
+            return []
+        return [json.loads(line) for line in path.read_text().splitlines()]
+
+    yield start, spans
+    tracing.disable_tracing()
+    for provider in providers:
+        provider.shutdown()
+
+
+def _update(api, subdomain_id, headers=None):
+    return api.run(
+        lambda client: client.put(
+            f"/api/v1/subdomains/{subdomain_id}",
+            json={"subdomain": "demo", "target_domain": "y.app"},
+            headers=headers,
+        ),
+        asgi_app=TracingMiddleware(app),
+    )
+
+
+def _seed(fake_netlify, user, db):
+    subdomain = Subdomain(
+        subdomain="demo",
+        target_domain="x.app",
+        record_type="CNAME",
+        ttl=3600,
+        user_id=user.id,
+    )
+    db.add(subdomain)
+    db.commit()
+    fake_netlify.add_record("demo.fosscu.org", "x.app")
+    return subdomain
+
+
+def test_request_spans_nest_netlify_and_db_calls(api, fake_netlify, user, db, traces):
+    subdomain = _seed(fake_netlify, user, db)
+    start, spans = traces
+    start()
+
+    assert _update(api, subdomain.id).status_code == 200
+
+    recorded = spans()
+    (server,) = [s for s in recorded if s["kind"] == "SpanKind.SERVER"]
+    assert server["name"] == "PUT /api/v1/subdomains/{subdomain_id}"
+    assert server["attributes"]["http.response.status_code"] == 200
+    children = [
+        s["name"] for s in recorded if s["parent_id"] == server["context"]["span_id"]
+    ]
+    assert "netlify.update_dns_record" in children
+    assert "netlify.get_zone_id_by_domain" in children
+    assert "SELECT" in children and "UPDATE" in children
+    trace_ids = {s["context"]["trace_id"] for s in recorded}
+    assert trace_ids == {server["context"]["trace_id"]}
+
+
+def test_sampling_follows_the_caller(api, fake_netlify, user, db, traces):
+    subdomain = _seed(fake_netlify, user, db)
+    start, spans = traces
+    start(sample_ratio=0.0)
+
+    _update(api, subdomain.id)
+    assert spans() == []
+
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    _update(
+        api,
+        subdomain.id,
+        headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"},
+    )
+    assert {s["context"]["trace_id"] for s in spans()} == {f"0x{trace_id}"}
+
+
+def test_tracing_an_engine_twice_spans_each_statement_once(traces):
+    engine = create_engine("sqlite://")
+    trace_engine(engine)
+    trace_engine(engine)
+    start, spans = traces
+    start()
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    assert [s["name"] for s in spans()] == ["SELECT"]
+
+
+def test_file_exporter_closes_its_file_on_shutdown(tmp_path):
+    settings = get_settings().model_copy(
+        update={
+            "TRACING_EXPORTER": "file",
+            "TRACING_FILE_PATH": str(tmp_path / "traces.jsonl"),
+        }
+    )
+    exporter = tracing._build_exporter(settings)
+
+    exporter.shutdown()
+
+    assert exporter.out.closed
@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react'
 import { useAuth } from '@/context/AuthContext';
-import { useSubdomainCreate } from '@/hooks/useSubdomainCreate';
+import { useSubdomainCreate, waitForOperation } from '@/hooks/useSubdomainCreate';
 import { useGetSubdomains } from '@/hooks/useGetSubdomains';
 import { useDeleteSubdomain } from "../hooks/useDeleteSubdomain";
 
@@ -661,6 +661,13 @@ const Domain = () => {
             status
         };
         setRequests(prev => [newRequest, ...prev]);
+        return newRequest.id;
+    };
+
+    const updateRequest = (id: string, response: string, status: DNSRequest['status']) => {
+        setRequests(prev => prev.map(req =>
+            req.id === id ? { ...req, response, status } : req
+        ));
     };
 
     const handleSubmit = async (e: React.FormEvent) => {
@@ -676,7 +683,7 @@ const Domain = () => {
         };
 
         // Add pending request
-        addRequest(
+        const requestId = addRequest(
             `Creating ${newRecord.type} record for ${subdomain}.${domain}.fosscu.org`,
             'Pending...',
             'pending'
@@ -693,21 +700,31 @@ const Domain = () => {
                     content: '',
                     ttl: 3600
                 });
-                // Update request status to success
-                setRequests(prev => prev.map(req => 
-                    req.status === 'pending' 
-                        ? { ...req, response: 'Record created successfully', status: 'success' }
-                        : req
-                ));
+                // The name is claimed, the DNS record is created in the background
+                updateRequest(requestId, 'Name claimed, creating the DNS record...', 'pending');
+                const operation = await waitForOperation(result);
+                if (operation.status === 'done') {
+                    updateRequest(requestId, 'Record created successfully', 'success');
+                } else if (operation.status === 'failed') {
+                    updateRequest(
+                        requestId,
+                        `Failed to create record: ${operation.last_error ?? 'unknown error'}`,
+                        'error'
+                    );
+                    // A failed record releases the name again
+                    await refreshSubdomains();
+                } else if (operation.status === 'cancelled') {
+                    updateRequest(requestId, 'Record replaced by a later change', 'success');
+                } else {
+                    updateRequest(requestId, 'Still creating the DNS record, check back later', 'pending');
+                }
+            } else {
+                updateRequest(requestId, 'Failed to create record', 'error');
             }
         } catch (error) {
             console.error('Error creating subdomain:', error);
             // Update request status to error
-            setRequests(prev => prev.map(req => 
-                req.status === 'pending' 
-                    ? { ...req, response: 'Failed to create record', status: 'error' }
-                    : req
-            ));
+            updateRequest(requestId, 'Failed to create record', 'error');
         }
     };
 
@@ -715,42 +732,35 @@ const Domain = () => {
         setDeletingId(id);
         const recordToDelete = subdomains.find(s => s.id === id);
         
-        if (recordToDelete) {
-            // Add pending request
-            addRequest(
+        // Add pending request
+        const requestId = recordToDelete
+            ? addRequest(
                 `Deleting ${recordToDelete.record_type} record for ${recordToDelete.subdomain}.${domain}.fosscu.org`,
                 'Pending...',
                 'pending'
-            );
-        }
+            )
+            : null;
+        const finishRequest = (response: string, status: DNSRequest['status']) => {
+            if (requestId) {
+                updateRequest(requestId, response, status);
+            }
+        };
 
         try {
             const result = await deleteSubdomain(id);
             if (result?.success) {
                 removeSubdomain(id);
                 // Update request status to success
-                setRequests(prev => prev.map(req => 
-                    req.status === 'pending' 
-                        ? { ...req, response: 'Record deleted successfully', status: 'success' }
-                        : req
-                ));
+                finishRequest('Record deleted successfully', 'success');
             } else {
                 // Update request status to error
-                setRequests(prev => prev.map(req => 
-                    req.status === 'pending' 
-                        ? { ...req, response: 'Failed to delete record', status: 'error' }
-                        : req
-                ));
+                finishRequest('Failed to delete record', 'error');
                 refreshSubdomains();
             }
         } catch (error) {
             console.error('Error deleting subdomain:', error);
             // Update request status to error
-            setRequests(prev => prev.map(req => 
-                req.status === 'pending' 
-                    ? { ...req, response: 'Error deleting record', status: 'error' }
-                    : req
-            ));
+            finishRequest('Error deleting record', 'error');
             refreshSubdomains();
         } finally {
             setDeletingId(null);
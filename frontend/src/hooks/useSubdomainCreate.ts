@@ -9,12 +9,16 @@ interface SubdomainCreateRequest {
   ttl: number;
 }
 
-interface SubdomainCreateResponse {
+// The DNS record is provisioned in the background; poll
+// /api/v1/subdomains/operations/{id} for its status
+export interface SubdomainCreateResponse {
   id: number;
-  subdomain: string;
-  target_domain: string;
-  record_type: string;
-  ttl: number;
+  action: string;
+  status: 'pending' | 'in_flight' | 'done' | 'failed' | 'cancelled';
+  subdomain_id: number | null;
+  hostname: string;
+  attempts: number;
+  last_error: string | null;
   created_at: string;
   updated_at: string;
 }
@@ -27,6 +31,35 @@ interface ValidationError {
   }>;
 }
 
+const OPERATION_POLL_INTERVAL_MS = 1000;
+const OPERATION_POLL_ATTEMPTS = 60;
+
+const isFinished = (operation: SubdomainCreateResponse) =>
+  operation.status !== 'pending' && operation.status !== 'in_flight';
+
+// Poll the DNS operation until it reaches a final status. Resolves with the
+// last state seen, which is still unfinished if polling gave up.
+export const waitForOperation = async (
+  operation: SubdomainCreateResponse
+): Promise<SubdomainCreateResponse> => {
+  const token = localStorage.getItem('token');
+  let current = operation;
+  for (let attempt = 0; attempt < OPERATION_POLL_ATTEMPTS && !isFinished(current); attempt++) {
+    await new Promise(resolve => setTimeout(resolve, OPERATION_POLL_INTERVAL_MS));
+    const response = await fetch(`${baseUrl}/api/v1/subdomains/operations/${operation.id}`, {
+      headers: {
+        'Authorization': `Bearer ${token}`,
+      },
+      cache: 'no-store',
+    });
+    if (!response.ok) {
+      throw new Error('Failed to check the DNS record status');
+    }
+    current = await response.json();
+  }
+  return current;
+};
+
 export const useSubdomainCreate = () => {
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState<ValidationError | null>(null);